@@ -1,8 +1,11 @@
 import threading
 import select
 import bluetooth
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class AndroidBluetoothServer:
     def __init__(self, port=1, backlog=1, expected_mac_address=None):
         self.port = port
@@ -13,14 +16,14 @@ class AndroidBluetoothServer:
         self.client_info = None
         self.is_listening = False
         self.stop_event = threading.Event() # Event to signal server to stop
-        print(f"BraccioBluetoothServer initialized on port: {self.port}")
+        logger.info("BraccioBluetoothServer initialized on port: %s", self.port)
         if self.expected_mac_address:
-            print(f"Server configured to accept only MAC: {self.expected_mac_address}")
+            logger.info("Server configured to accept only MAC: %s", self.expected_mac_address)
 
 
     def start_server(self):
         if self.server_sock:
-            print("Server socket already active.")
+            logger.info("Server socket already active.")
             return True
 
         try:
@@ -28,20 +31,20 @@ class AndroidBluetoothServer:
             self.server_sock.bind(("", self.port))
             self.server_sock.listen(self.backlog)
             self.is_listening = True
-            print(f"Bluetooth server started and listening on port {self.port}...")
+            logger.info("Bluetooth server started and listening on port %s...", self.port)
             return True
         except Exception as e:
-            print(f"An unexpected error occurred during server start: {e}")
+            logger.error("An unexpected error occurred during server start: %s", e)
             self.server_sock = None
             self.is_listening = False
             return False
 
     def accept_connection(self):
         if not self.server_sock:
-            print("ERROR: Server not started. Cannot accept connections.")
+            logger.error("Server not started. Cannot accept connections.")
             return None, None
 
-        print("Waiting for the Android App to connect...")
+        logger.info("Waiting for the Android App to connect...")
         try:
             while not self.stop_event.is_set():
                 ready_to_read, _, _ = select.select([self.server_sock], [], [], 1) # select socket
@@ -50,44 +53,44 @@ class AndroidBluetoothServer:
                     connected_mac = new_client_info[0].upper() # Extract MAC address
 
                     if self.expected_mac_address and connected_mac != self.expected_mac_address:
-                        print(f"Rejected connection from {connected_mac}. Expected: {self.expected_mac_address}")
+                        logger.warning("Rejected connection from %s. Expected: %s", connected_mac, self.expected_mac_address)
                         new_client_sock.close() # Close unwanted connection
                         continue                # Continue waiting for the correct MAC
                     else:
                         self.client_sock = new_client_sock
                         self.client_info = new_client_info
-                        print(f"Accepted connection from {self.client_info}")
+                        logger.info("Accepted connection from %s", self.client_info)
                         if self.expected_mac_address:
-                            print(f"Specific MAC {self.expected_mac_address} connected. Stopping server listen.")
+                            logger.info("Specific MAC %s connected. Stopping server listen.", self.expected_mac_address)
                             self.stop_event.set()
                             if self.server_sock:
                                 self.server_sock.close()
                                 self.is_listening = False
                         return self.client_sock, self.client_info
-            print("Server stop event received, not accepting further connections.")
+            logger.info("Server stop event received, not accepting further connections.")
             return None, None 
         except Exception as e:
-            print(f"An unexpected error occurred during connection acceptance: {e}")
+            logger.error("An unexpected error occurred during connection acceptance: %s", e)
             self.client_sock = None
             self.client_info = None
             return None, None
 
     def send_data(self, client_socket, data):
         if not client_socket:
-            print("ERROR: No client socket provided to send data.")
+            logger.error("No client socket provided to send data.")
             return False
         try:
             client_socket.send(data.encode('utf-8'))
-            print(f"Sent BT data to client {self.client_info}: '{data.strip()}'")
+            logger.info("Sent BT data to client %s: '%s'", self.client_info, data.strip())
             return True
         except Exception as e:
-            print(f"An unexpected error occurred during data send: {e}")
+            logger.error("An unexpected error occurred during data send: %s", e)
             self.close_client_connection(client_socket)
             return False
 
     def send_angles(self, client_socket, base_angle, shoulder_angle, elbow_angle, obj_class=0):
         if not client_socket:
-            print("ERROR: No client socket provided to send angles.")
+            logger.error("No client socket provided to send angles.")
             return False
 
         # Clip and round angles to integers
@@ -108,50 +111,50 @@ class AndroidBluetoothServer:
 
         try:
             client_socket.send(data_string.encode('utf-8'))
-            print(f"Sent BT angles to client {self.client_info}: '{data_string.strip()}'")
+            logger.info("Sent BT angles to client %s: '%s'", self.client_info, data_string.strip())
             return True
         except Exception as e:
-            print(f"An unexpected error occurred during angle send: {e}")
+            logger.error("An unexpected error occurred during angle send: %s", e)
             self.close_client_connection(client_socket)
             return False
 
     def receive_data(self, client_socket, buffer_size=1024):
         if not client_socket:
-            print("ERROR: No client socket provided to receive data.")
+            logger.error("No client socket provided to receive data.")
             return ""
         try:
             data = client_socket.recv(buffer_size).decode('utf-8').strip()
             if data:
-                print(f"Received BT data from client {self.client_info}: '{data}'")
+                logger.info("Received BT data from client %s: '%s'", self.client_info, data)
             return data
         except Exception as e:
-            print(f"An unexpected error occurred during data receive: {e}")
+            logger.error("An unexpected error occurred during data receive: %s", e)
             self.close_client_connection(client_socket)
             return ""
 
     def close_client_connection(self, client_socket):
         if client_socket:
-            print(f"Closing client connection {self.client_info}.")
+            logger.info("Closing client connection %s.", self.client_info)
             try:
                 client_socket.close()
             except Exception as e:
-                print(f"Error closing client socket: {e}")
+                logger.error("Error closing client socket: %s", e)
             finally:
                 if client_socket == self.client_sock: # If it's the primary client
                     self.client_sock = None
                     self.client_info = None
         else:
-            print("No client socket to close.")
+            logger.info("No client socket to close.")
 
     def stop_server(self):
-        print("Signaling server to stop...")
+        logger.info("Signaling server to stop...")
         self.stop_event.set() # Set the event to break out of accept_connection loop
         if self.server_sock:
-            print("Closing server Bluetooth socket.")
+            logger.info("Closing server Bluetooth socket.")
             try:
                 self.server_sock.close()
             finally:
                 self.server_sock = None
                 self.is_listening = False
-        print("Bluetooth server stopped.")
+        logger.info("Bluetooth server stopped.")
 
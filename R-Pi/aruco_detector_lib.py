@@ -1,8 +1,11 @@
 import cv2
 import cv2.aruco as aruco
+import logging
 import numpy as np
 import os
 
+logger = logging.getLogger(__name__)
+
 class ObjectDetector:
     def __init__(self, calibration_file, aruco_dict_type, marker_length_mm, color_ranges, min_object_area_pixels):
         self.calibration_file = calibration_file
@@ -13,6 +16,9 @@ class ObjectDetector:
 
         self.camera_matrix = None
         self.dist_coeffs = None
+        self.undistort_map1 = None
+        self.undistort_map2 = None
+        self.undistort_size = None
         self.aruco_dict = None
         self.aruco_parameters = None
         self.aruco_detector = None
@@ -20,8 +26,8 @@ class ObjectDetector:
         self._load_camera_calibration()
         self._initialize_aruco_detector()
 
-        print(f"Marker Length: {self.marker_length_mm} mm")
-        print(f"Detecting colors: {', '.join(self.color_ranges.keys())}")
+        logger.info("Marker Length: %s mm", self.marker_length_mm)
+        logger.info("Detecting colors: %s", ', '.join(self.color_ranges.keys()))
 
 
     def _load_camera_calibration(self):
@@ -30,11 +36,18 @@ class ObjectDetector:
                 calib_data = np.load(self.calibration_file)
                 self.camera_matrix = calib_data['mtx']
                 self.dist_coeffs = calib_data['dist']
-                print(f"Loaded camera calibration data from {self.calibration_file}.")
+                logger.info("Loaded camera calibration data from %s.", self.calibration_file)
+
+                # Precomputed undistortion maps are optional, older files only have mtx/dist
+                if 'map1' in calib_data and 'map2' in calib_data and 'image_size' in calib_data:
+                    self.undistort_map1 = calib_data['map1']
+                    self.undistort_map2 = calib_data['map2']
+                    self.undistort_size = tuple(int(v) for v in calib_data['image_size'])
+                    logger.info("Loaded undistortion maps for %sx%s frames.", self.undistort_size[0], self.undistort_size[1])
             else:
                 raise FileNotFoundError(f"Calibration file '{self.calibration_file}' not found.")
         except Exception as e:
-            print(f"ERROR: Failed to load camera calibration data: {e}")
+            logger.error("Failed to load camera calibration data: %s", e)
             raise
 
     def _initialize_aruco_detector(self):
@@ -75,12 +88,34 @@ class ObjectDetector:
 
             return point_3d_camera_frame
         except Exception as e:
-            print(f"DEBUG: Error in _get_3d_coordinates_on_plane: {e}")
+            logger.debug("Error in _get_3d_coordinates_on_plane: %s", e)
+            return None
+
+    def get_rel_3d_from_aruco(self, pixel_coords, rvec, tvec):
+        # Also used by flight_replay.py to re-project replayed centroids with a recorded marker pose
+        rvec = np.asarray(rvec, dtype=np.float64)
+        tvec = np.asarray(tvec, dtype=np.float64)
+        object_3d_camera_frame = self._get_3d_coordinates_on_plane(pixel_coords, rvec, tvec)
+        if object_3d_camera_frame is None:
             return None
 
+        R_marker_to_cam, _ = cv2.Rodrigues(rvec)
+        R_cam_to_marker = R_marker_to_cam.T
+        T_cam_to_marker = -R_cam_to_marker @ tvec.reshape(3,1)
+
+        object_3d_marker_frame = R_cam_to_marker @ object_3d_camera_frame.reshape(3,1) + T_cam_to_marker
+
+        Y_mm = -object_3d_marker_frame[0][0]
+        X_mm = object_3d_marker_frame[1][0]
+        Z_mm = object_3d_marker_frame[2][0]
+        return (X_mm, Y_mm, Z_mm)
+
     def process_frame(self, frame):
         # Undistort the frame using the loaded camera calibration
-        undistorted_frame = cv2.undistort(frame, self.camera_matrix, self.dist_coeffs, None, self.camera_matrix)
+        if self.undistort_map1 is not None and (frame.shape[1], frame.shape[0]) == self.undistort_size:
+            undistorted_frame = cv2.remap(frame, self.undistort_map1, self.undistort_map2, cv2.INTER_LINEAR)
+        else:
+            undistorted_frame = cv2.undistort(frame, self.camera_matrix, self.dist_coeffs, None, self.camera_matrix)
         display_frame = undistorted_frame.copy()
 
         gray_frame = cv2.cvtColor(undistorted_frame, cv2.COLOR_BGR2GRAY)
@@ -132,8 +167,10 @@ class ObjectDetector:
 
             except Exception as e:
                 cv2.putText(display_frame, "ArUco Pose Error!", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                logger.warning("ArUco pose estimation failed: %s", e, extra={'rate_limit': True})
         else:
             cv2.putText(display_frame, "No ArUco Markers Found!", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            logger.warning("No ArUco Markers Found", extra={'rate_limit': True}) # repeats every frame while the marker is covered
 
 
         # --- Color-Based Object Detection ---
@@ -177,22 +214,10 @@ class ObjectDetector:
                             cv2.putText(display_frame, f"Rel Px: ({rel_px_x},{rel_px_y})", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
                             # Estimate 3D Coordinates relative to ArUco Marker's Origin
-                            object_3d_camera_frame = self._get_3d_coordinates_on_plane(
-                                (cx, cy), aruco_data['rvec'], aruco_data['tvec']
-                            )
-
-                            if object_3d_camera_frame is not None:
-                                R_marker_to_cam, _ = cv2.Rodrigues(aruco_data['rvec'])
-                                R_cam_to_marker = R_marker_to_cam.T
-                                T_cam_to_marker = -R_cam_to_marker @ aruco_data['tvec'].reshape(3,1)
-
-                                object_3d_marker_frame = R_cam_to_marker @ object_3d_camera_frame.reshape(3,1) + T_cam_to_marker
-                                
-                                Y_mm = -object_3d_marker_frame[0][0]
-                                X_mm = object_3d_marker_frame[1][0]
-                                Z_mm = object_3d_marker_frame[2][0]
-                                rel_3d_from_aruco_mm = (X_mm, Y_mm, Z_mm)
+                            rel_3d_from_aruco_mm = self.get_rel_3d_from_aruco((cx, cy), aruco_data['rvec'], aruco_data['tvec'])
 
+                            if rel_3d_from_aruco_mm is not None:
+                                X_mm, Y_mm, Z_mm = rel_3d_from_aruco_mm
                                 cv2.putText(display_frame, f"3D Rel Marker (mm):", (x, y + h + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
                                 cv2.putText(display_frame, f"X:{X_mm:.0f} Y:{Y_mm:.0f} Z:{Z_mm:.0f}",
                                             (x, y + h + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
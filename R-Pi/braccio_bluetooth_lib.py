@@ -1,32 +1,36 @@
 import bluetooth
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class BraccioBluetoothSender:
     def __init__(self, mac_address, port=1):
         self.mac_address = mac_address
         self.port = port
         self.sock = None
-        print(f"BraccioBluetoothSender initialized for MAC: {self.mac_address}, Port: {self.port}")
+        self.last_message = None
+        logger.info("BraccioBluetoothSender initialized for MAC: %s, Port: %s", self.mac_address, self.port)
 
     def connect(self):
         if self.sock:
-            print("Already connected to Bluetooth.")
+            logger.info("Already connected to Bluetooth.")
             return True
 
         try:
-            print(f"Attempting to connect to HC-05 at {self.mac_address} on port {self.port}...")
+            logger.info("Attempting to connect to HC-05 at %s on port %s...", self.mac_address, self.port)
             self.sock = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
             self.sock.connect((self.mac_address, self.port))
-            print("Successfully connected to HC-05!")
+            logger.info("Successfully connected to HC-05!")
             return True
         except Exception as e:
-            print(f"An unexpected error occurred during Bluetooth connection: {e}")
+            logger.error("An unexpected error occurred during Bluetooth connection: %s", e)
             self.sock = None
             return False
 
     def send_angles(self, base_angle, shoulder_angle, elbow_angle, obj_class=0):
         if not self.sock:
-            print("ERROR: Not connected to Bluetooth. Cannot send data.")
+            logger.error("Not connected to Bluetooth. Cannot send data.")
             return False
 
         base_angle_int = int(np.clip(round(base_angle), 0, 180))
@@ -51,10 +55,11 @@ class BraccioBluetoothSender:
 
         try:
             self.sock.send(data_string.encode('utf-8'))
-            print(f"Sent BT data: '{data_string.strip()}'")
+            self.last_message = data_string
+            logger.info("Sent BT data: '%s'", data_string.strip())
             return True
         except Exception as e:
-            print(f"An unexpected error occurred during Bluetooth send: {e}")
+            logger.error("An unexpected error occurred during Bluetooth send: %s", e)
             self.disconnect()
             return False
 
@@ -64,12 +69,12 @@ class BraccioBluetoothSender:
 
     def disconnect(self):
         if self.sock:
-            print("Closing Bluetooth socket.")
+            logger.info("Closing Bluetooth socket.")
             try:
                 self.sock.close()
             except Exception as e:
-                print(f"Error closing Bluetooth socket: {e}")
+                logger.error("Error closing Bluetooth socket: %s", e)
             finally:
                 self.sock = None
         else:
-            print("Bluetooth socket is already closed or not connected.")
\ No newline at end of file
+            logger.info("Bluetooth socket is already closed or not connected.")
\ No newline at end of file
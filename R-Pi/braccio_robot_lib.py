@@ -1,5 +1,8 @@
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class BraccioKinematicsSolver:
     def __init__(self):
         self.L0 = 71.5 # base height
@@ -7,12 +10,12 @@ class BraccioKinematicsSolver:
         self.L2 = 125.0 # elbow lenght
         self.L3 = 192.0 # wrist length
 
-        print("\n--- Braccio Kinematics Solver Initialized ---")
-        print(f"L0 (Base Height): {self.L0} mm")
-        print(f"L1 (Bicep): {self.L1} mm")
-        print(f"L2 (Forearm): {self.L2} mm")
-        print(f"L3 (Gripper Offset): {self.L3} mm")
-        print("-------------------------------------------\n")
+        logger.info("--- Braccio Kinematics Solver Initialized ---")
+        logger.info("L0 (Base Height): %s mm", self.L0)
+        logger.info("L1 (Bicep): %s mm", self.L1)
+        logger.info("L2 (Forearm): %s mm", self.L2)
+        logger.info("L3 (Gripper Offset): %s mm", self.L3)
+        logger.info("-------------------------------------------")
 
     def calculate_joint_angles(self, target_x_mm, target_y_mm, target_z_mm):
         x = float(target_x_mm)
@@ -29,7 +32,7 @@ class BraccioKinematicsSolver:
         base_servo_angle = 90 - base_angle_deg
 
         if not (0 <= base_servo_angle <= 180):
-            print(f"WARNING: Base angle {base_servo_angle:.1f}deg out of typical 0-180 range. Clamping.")
+            logger.warning("Base angle %.1fdeg out of typical 0-180 range. Clamping.", base_servo_angle)
             base_servo_angle = np.clip(base_servo_angle, 0, 180)
 
         # if base_servo_angle < 80:
@@ -47,14 +50,14 @@ class BraccioKinematicsSolver:
         if R < 1e-6: # Very close to base center
             R = 0 # Treat as 0 to simplify
             if abs(z_eff) < 1e-6:
-                print("WARNING: Target is at base origin. Robot configuration ambiguous.")
+                logger.warning("Target is at base origin. Robot configuration ambiguous.")
                 
         # Total straight-line distance from shoulder joint to wrist_v joint
         D = np.sqrt(R**2 + z_eff**2) 
 
         # Check if in reach
         if D > (self.L1 + self.L2 + 30) or D < (abs(self.L1 - self.L2) + 30):
-            print(f"ERROR: Target ({x:.1f},{y:.1f},{z:.1f}) mm is unreachable. D={D:.1f} mm, Max Reach={self.L1 + self.L2:.1f} mm.")
+            logger.error("Target (%.1f,%.1f,%.1f) mm is unreachable. D=%.1f mm, Max Reach=%.1f mm.", x, y, z, D, self.L1 + self.L2)
             return None
 
         # --- 3. Calculate Shoulder and Elbow Angles using Law of Cosines ---
@@ -65,7 +68,7 @@ class BraccioKinematicsSolver:
             cos_elbow_angle = np.clip(cos_elbow_angle, -1.0, 1.0)
             elbow_angle_rad = np.arccos(cos_elbow_angle)
         except RuntimeWarning:
-            print("WARNING: Arccos input out of range for elbow. Clamped.")
+            logger.warning("Arccos input out of range for elbow. Clamped.")
             return None 
         
         # Angle between L1 and D at the shoulder joint
@@ -74,7 +77,7 @@ class BraccioKinematicsSolver:
             cos_shoulder_angle_D = np.clip(cos_shoulder_angle_D, -1.0, 1.0)
             shoulder_angle_D_rad = np.arccos(cos_shoulder_angle_D)
         except RuntimeWarning:
-            print("WARNING: Arccos input out of range for shoulder-D. Clamped.")
+            logger.warning("Arccos input out of range for shoulder-D. Clamped.")
             return None
 
         # Angle of the line D with the horizontal
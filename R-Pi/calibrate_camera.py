@@ -0,0 +1,189 @@
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import cv2.aruco as aruco
+import numpy as np
+
+# Produces the camera_calibration.npz loaded by ObjectDetector (mtx, dist) together with
+# precomputed undistortion maps (map1, map2, image_size) so process_frame can use cv2.remap.
+# Corner detection runs in a process pool and per-image results are cached, so re-running
+# after adding or removing a few images only detects the new ones.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+CACHE_FILE_NAME = ".calibration_cache.json"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Calibrate the camera from a directory of chessboard or ChArUco images.")
+    parser.add_argument("image_dir", help="Directory with the calibration images")
+    parser.add_argument("--pattern", choices=["chessboard", "charuco"], default="chessboard")
+    parser.add_argument("--board-size", type=int, nargs=2, metavar=("COLS", "ROWS"), default=(9, 6),
+                        help="Inner corners for a chessboard, squares for a ChArUco board")
+    parser.add_argument("--square-size-mm", type=float, default=25.0)
+    parser.add_argument("--marker-size-mm", type=float, default=18.0, help="ChArUco marker side length")
+    parser.add_argument("--aruco-dict", default="DICT_6X6_250", help="ChArUco dictionary name")
+    parser.add_argument("--min-charuco-corners", type=int, default=6)
+    parser.add_argument("--output", default="camera_calibration.npz")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached corner results")
+    return parser.parse_args()
+
+def get_board_params(args):
+    return {
+        'pattern': args.pattern,
+        'board_size': list(args.board_size),
+        'square_size_mm': args.square_size_mm,
+        'marker_size_mm': args.marker_size_mm,
+        'aruco_dict': args.aruco_dict,
+        'min_charuco_corners': args.min_charuco_corners,
+    }
+
+def make_charuco_board(params):
+    aruco_dict = aruco.getPredefinedDictionary(getattr(aruco, params['aruco_dict']))
+    return aruco.CharucoBoard(tuple(params['board_size']), params['square_size_mm'], params['marker_size_mm'], aruco_dict)
+
+def detect_corners(image_path, params):
+    # Runs in a worker process, returns plain lists so the result can be cached as JSON
+    result = {'found': False, 'image_size': None, 'object_points': None, 'image_points': None}
+
+    image = cv2.imread(image_path)
+    if image is None:
+        return image_path, result
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    result['image_size'] = [gray.shape[1], gray.shape[0]]
+
+    if params['pattern'] == "chessboard":
+        cols, rows = params['board_size']
+        found, corners = cv2.findChessboardCorners(gray, (cols, rows), cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE)
+        if not found:
+            return image_path, result
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+        corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+        object_points = np.zeros((cols * rows, 3), np.float32)
+        object_points[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * params['square_size_mm']
+        image_points = corners.reshape(-1, 2)
+    else:
+        board = make_charuco_board(params)
+        charuco_corners, charuco_ids, _, _ = aruco.CharucoDetector(board).detectBoard(gray)
+        if charuco_ids is None or len(charuco_ids) < params['min_charuco_corners']:
+            return image_path, result
+        object_points, image_points = board.matchImagePoints(charuco_corners, charuco_ids)
+        object_points = object_points.reshape(-1, 3)
+        image_points = image_points.reshape(-1, 2)
+
+    result['found'] = True
+    result['object_points'] = object_points.tolist()
+    result['image_points'] = image_points.tolist()
+    return image_path, result
+
+def load_cache(cache_path, params):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except Exception as e:
+        print(f"WARNING: Could not read calibration cache '{cache_path}': {e}")
+        return {}
+    # Board settings changed, every cached corner set is stale
+    if cache.get('params') != params:
+        return {}
+    return cache.get('images', {})
+
+def save_cache(cache_path, params, images):
+    with open(cache_path, "w") as f:
+        json.dump({'params': params, 'images': images}, f)
+
+def get_cache_key(image_path):
+    stat = os.stat(image_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def main():
+    args = parse_args()
+    params = get_board_params(args)
+
+    image_paths = sorted(
+        path for path in glob.glob(os.path.join(args.image_dir, "*"))
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not image_paths:
+        print(f"ERROR: No images found in '{args.image_dir}'.")
+        return 1
+
+    cache_path = os.path.join(args.image_dir, CACHE_FILE_NAME)
+    cache = {} if args.no_cache else load_cache(cache_path, params)
+
+    results = {}
+    pending = []
+    for path in image_paths:
+        name = os.path.basename(path)
+        cached = cache.get(name)
+        if cached and cached['key'] == get_cache_key(path):
+            results[name] = cached
+        else:
+            pending.append(path)
+
+    print(f"\n--- Camera Calibration ---")
+    print(f"Images: {len(image_paths)} ({len(image_paths) - len(pending)} cached, {len(pending)} to detect)")
+    print(f"Pattern: {args.pattern} {args.board_size[0]}x{args.board_size[1]}, square {args.square_size_mm} mm")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for path, result in pool.map(detect_corners, pending, [params] * len(pending)):
+                result['key'] = get_cache_key(path)
+                results[os.path.basename(path)] = result
+                print(f"  {os.path.basename(path)}: {'corners found' if result['found'] else 'no board'}")
+        save_cache(cache_path, params, results)
+
+    used_names = [name for name in sorted(results) if results[name]['found']]
+    if len(used_names) < 3:
+        print(f"ERROR: Board found in only {len(used_names)} images, at least 3 are needed.")
+        return 1
+
+    image_sizes = {tuple(results[name]['image_size']) for name in used_names}
+    if len(image_sizes) != 1:
+        print(f"ERROR: Images have different sizes: {sorted(image_sizes)}")
+        return 1
+    image_size = image_sizes.pop()
+
+    object_points = [np.array(results[name]['object_points'], dtype=np.float32) for name in used_names]
+    image_points = [np.array(results[name]['image_points'], dtype=np.float32) for name in used_names]
+
+    rms, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(object_points, image_points, image_size, None, None)
+
+    # --- Reprojection error per image ---
+    print(f"\nReprojection error (RMS): {rms:.3f} px")
+    errors = []
+    for name, obj_pts, img_pts, rvec, tvec in zip(used_names, object_points, image_points, rvecs, tvecs):
+        projected, _ = cv2.projectPoints(obj_pts, rvec, tvec, camera_matrix, dist_coeffs)
+        error = np.sqrt(np.mean(np.sum((projected.reshape(-1, 2) - img_pts) ** 2, axis=1)))
+        errors.append(error)
+        print(f"  {name}: {error:.3f} px")
+    mean_error = float(np.mean(errors))
+    worst = used_names[int(np.argmax(errors))]
+    print(f"Mean per-image error: {mean_error:.3f} px, worst: {worst} ({max(errors):.3f} px)")
+
+    # Same new camera matrix as ObjectDetector.process_frame uses with cv2.undistort
+    map1, map2 = cv2.initUndistortRectifyMap(camera_matrix, dist_coeffs, None, camera_matrix, image_size, cv2.CV_16SC2)
+
+    np.savez(
+        args.output,
+        mtx=camera_matrix,
+        dist=dist_coeffs,
+        image_size=np.array(image_size),
+        map1=map1,
+        map2=map2,
+        rms=rms
+    )
+    print(f"\nCamera matrix:\n{camera_matrix}")
+    print(f"Distortion coefficients: {dist_coeffs.ravel()}")
+    print(f"Saved calibration for {image_size[0]}x{image_size[1]} images to {args.output}.")
+    print("-------------------------------------------\n")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,83 @@
+import argparse
+import json
+import logging
+from logging_lib import setup_logging
+from sort_cell_lib import SortCell, DetectionPool
+
+logger = logging.getLogger("cell_orchestrator")
+
+# Runs several sort cells (camera + Braccio) from one process. Every cell has its own
+# capture thread, motion gate, frame rate governor and pick controller, detection runs
+# on a worker pool shared by all cells. See cells.example.json for the config format.
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Drive several camera + Braccio sort cells from one process.")
+    parser.add_argument("config", help="JSON file describing the cells (see cells.example.json)")
+    parser.add_argument("--cells", help="Comma separated names of the cells to run, default all")
+    parser.add_argument("--workers", type=int, help="Detection worker threads, overrides the config file")
+    parser.add_argument("--log-file", help="Also write the log to this file")
+    return parser.parse_args()
+
+def load_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    # Settings in "defaults" apply to every cell unless the cell overrides them
+    defaults = config.get('defaults', {})
+    cells = [{**defaults, **cell} for cell in config['cells']]
+    names = [cell['name'] for cell in cells]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Cell names must be unique, got: {', '.join(names)}")
+    return config.get('detection_workers', 2), cells
+
+def build_cells(cell_configs):
+    cells = []
+    for cell_config in cell_configs:
+        try:
+            cells.append(SortCell.from_config(cell_config))
+        except Exception as e:
+            logger.error("Cell '%s' could not be initialized: %s", cell_config['name'], e)
+    return cells
+
+def run_cells(cells, num_workers):
+    pool = DetectionPool(num_workers=num_workers)
+    pool.start()
+
+    logger.info("--- Starting %s cells: %s ---", len(cells), ", ".join(cell.name for cell in cells))
+    for cell in cells:
+        cell.start(pool)
+
+    try:
+        for cell in cells:
+            cell.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping all cells...")
+        for cell in cells:
+            cell.stop()
+        for cell in cells:
+            cell.join()
+    finally:
+        pool.stop()
+        pool.log_stats()
+        logger.info("Cell orchestrator finished.")
+
+def main():
+    args = parse_args()
+    setup_logging(log_file=args.log_file)
+
+    num_workers, cell_configs = load_config(args.config)
+    if args.cells:
+        selected = args.cells.split(",")
+        cell_configs = [cell for cell in cell_configs if cell['name'] in selected]
+    if args.workers:
+        num_workers = args.workers
+    if not cell_configs:
+        logger.error("No cells to run.")
+        return
+
+    cells = build_cells(cell_configs)
+    if cells:
+        run_cells(cells, num_workers)
+
+if __name__ == "__main__":
+    main()
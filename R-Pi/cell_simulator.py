@@ -0,0 +1,564 @@
+import argparse
+import logging
+import os
+import queue
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import cv2
+import cv2.aruco as aruco
+import numpy as np
+from logging_lib import shutdown_logging
+
+# Hardware-free stand-in for the sort cell. Fake picamera2 and bluetooth modules are
+# installed before main.py is imported, so the real ObjectDetector, BraccioKinematicsSolver,
+# BraccioBluetoothSender, AndroidBluetoothServer and SortCell control loop all run unchanged
+# against a rendered scene, a simulated Braccio/STM32 and a simulated Android phone.
+# With --cells N, N simulated stations are driven by cell_orchestrator.py from one process.
+
+# --- Simulated camera (straight down pinhole camera above the table) ---
+IMAGE_SIZE = (1280, 720)
+FOCAL_LENGTH_PX = 1000.0
+CAMERA_HEIGHT_MM = 600.0
+MM_PER_PX = CAMERA_HEIGHT_MM / FOCAL_LENGTH_PX
+MARKER_CENTER_PX = (760, 520)
+TABLE_COLOUR_BGR = (120, 120, 120)
+
+# --- Simulated arm ---
+HOME_ANGLES = (90, 90, 90)
+BIN_ANGLES = {0: (10, 90, 90), 1: (40, 90, 90), 2: (140, 90, 90), 3: (170, 90, 90)}
+READY_MESSAGE = b"1" # what the STM32 sends when the arm is ready
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run main.py against a simulated camera, Braccio arm and Android app.")
+    parser.add_argument("--blocks", type=int, default=8, help="Number of blocks placed on the table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--block-size-mm", type=float, default=25.0)
+    parser.add_argument("--camera-fps", type=float, default=15.0)
+    parser.add_argument("--noise", type=float, default=2.0, help="Sensor noise sigma in grey levels")
+    parser.add_argument("--base-speed", type=float, default=60.0, help="Base servo speed in deg/s")
+    parser.add_argument("--shoulder-speed", type=float, default=45.0, help="Shoulder servo speed in deg/s")
+    parser.add_argument("--elbow-speed", type=float, default=45.0, help="Elbow servo speed in deg/s")
+    parser.add_argument("--grip-time", type=float, default=0.5, help="Seconds to close the gripper")
+    parser.add_argument("--release-time", type=float, default=0.5, help="Seconds to open the gripper")
+    parser.add_argument("--phone-start-delay", type=float, default=1.0, help="Seconds before the app sends start")
+    parser.add_argument("--pick-tolerance-mm", type=float, default=30.0)
+    parser.add_argument("--max-picks", type=int, default=None, help="Stop after this many pick attempts")
+    parser.add_argument("--duration", type=float, default=300.0, help="Stop after this many seconds")
+    parser.add_argument("--show", action="store_true", help="Show the main.py display window")
+    parser.add_argument("--cells", type=int, default=1, help="Number of stations, more than 1 runs them through cell_orchestrator.py")
+    parser.add_argument("--workers", type=int, default=2, help="Detection workers shared by the stations when --cells is more than 1")
+    return parser.parse_args()
+
+
+class SimScene:
+    def __init__(self, args, seed):
+        self.args = args
+        self.lock = threading.Lock()
+        self.blocks = []
+        self.marker_image = None
+        self.rng = np.random.default_rng(seed)
+
+    def setup(self, main_module):
+        self.marker_in_robot_frame_mm = (main_module.MARKER_X_IN_ROBOT_FRAME_MM, main_module.MARKER_Y_IN_ROBOT_FRAME_MM)
+        aruco_dict = aruco.getPredefinedDictionary(main_module.ARUCO_DICT_TYPE)
+        marker_px = int(round(main_module.MARKER_LENGTH_MM / MM_PER_PX))
+        self.marker_image = aruco.generateImageMarker(aruco_dict, 0, marker_px)
+        self.block_colours = {name: pick_block_colour(name, main_module.COLOR_RANGES) for name in main_module.COLOR_RANGES}
+        self._place_blocks(main_module)
+
+    def robot_to_px(self, x_mm, y_mm):
+        # Inverse of the marker frame -> robot frame mapping used by ObjectDetector and get_coords()
+        du = -(y_mm - self.marker_in_robot_frame_mm[1]) / MM_PER_PX
+        dv = -(x_mm - self.marker_in_robot_frame_mm[0]) / MM_PER_PX
+        return MARKER_CENTER_PX[0] + du, MARKER_CENTER_PX[1] + dv
+
+    def _place_blocks(self, main_module):
+        colour_names = list(self.block_colours)
+        half_block_px = self.args.block_size_mm / MM_PER_PX / 2
+        keep_out_px = self.marker_image.shape[0] / 2 + half_block_px * 2
+        attempts = 0
+        while len(self.blocks) < self.args.blocks:
+            attempts += 1
+            if attempts > 10000:
+                raise RuntimeError(f"Could only place {len(self.blocks)} reachable blocks on the table.")
+            x_mm = self.rng.uniform(60, 260)
+            y_mm = self.rng.uniform(-220, 220)
+            u, v = self.robot_to_px(x_mm, y_mm)
+            if not (half_block_px * 2 < u < IMAGE_SIZE[0] - half_block_px * 2 and half_block_px * 2 < v < IMAGE_SIZE[1] - half_block_px * 2):
+                continue
+            if np.hypot(u - MARKER_CENTER_PX[0], v - MARKER_CENTER_PX[1]) < keep_out_px:
+                continue
+            if any(np.hypot(x_mm - block['x_mm'], y_mm - block['y_mm']) < self.args.block_size_mm * 2 for block in self.blocks):
+                continue
+            # Rejected positions are expected here, keep the solver's unreachable errors out of the log
+            logging.disable(logging.ERROR)
+            try:
+                reachable = main_module.braccio_solver.calculate_joint_angles(x_mm, y_mm, 0) is not None
+            finally:
+                logging.disable(logging.NOTSET)
+            if not reachable:
+                continue
+            self.blocks.append({
+                'color_name': colour_names[len(self.blocks) % len(colour_names)],
+                'x_mm': x_mm,
+                'y_mm': y_mm
+            })
+
+    def remaining(self):
+        with self.lock:
+            return len(self.blocks)
+
+    def remove_nearest(self, x_mm, y_mm, tolerance_mm):
+        with self.lock:
+            if not self.blocks:
+                return None, None
+            distances = [np.hypot(x_mm - block['x_mm'], y_mm - block['y_mm']) for block in self.blocks]
+            index = int(np.argmin(distances))
+            if distances[index] > tolerance_mm:
+                return None, distances[index]
+            return self.blocks.pop(index), distances[index]
+
+    def render(self):
+        frame = np.full((IMAGE_SIZE[1], IMAGE_SIZE[0], 3), TABLE_COLOUR_BGR, dtype=np.uint8)
+
+        # Marker with a white quiet zone around it
+        side = self.marker_image.shape[0]
+        border = side // 6
+        x0 = MARKER_CENTER_PX[0] - side // 2
+        y0 = MARKER_CENTER_PX[1] - side // 2
+        frame[y0 - border:y0 + side + border, x0 - border:x0 + side + border] = 255
+        frame[y0:y0 + side, x0:x0 + side] = cv2.cvtColor(self.marker_image, cv2.COLOR_GRAY2BGR)
+
+        half_block_px = int(round(self.args.block_size_mm / MM_PER_PX / 2))
+        with self.lock:
+            for block in self.blocks:
+                u, v = self.robot_to_px(block['x_mm'], block['y_mm'])
+                cv2.rectangle(frame, (int(u) - half_block_px, int(v) - half_block_px), (int(u) + half_block_px, int(v) + half_block_px),
+                              self.block_colours[block['color_name']], -1)
+
+        if self.args.noise > 0:
+            noise = self.rng.normal(0, self.args.noise, frame.shape)
+            frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+        return frame
+
+
+def pick_block_colour(color_name, color_ranges, noise_margin=4):
+    # Find a BGR colour that lands inside this colour's HSV range and outside all the others,
+    # even after the simulated sensor noise is added to it
+    lower = color_ranges[color_name]["lower"]
+    upper = color_ranges[color_name]["upper"]
+    middle = (lower.astype(float) + upper.astype(float)) / 2
+    candidates = [
+        np.array([h, s, v])
+        for h in range(int(lower[0]), int(upper[0]) + 1, 2)
+        for s in range(int(lower[1]), int(upper[1]) + 1, 5)
+        for v in range(max(int(lower[2]), 80), int(upper[2]) + 1, 5)
+    ]
+    candidates.sort(key=lambda hsv: np.sum((hsv - middle) ** 2))
+
+    offsets = np.array([[db, dg, dr] for db in (-noise_margin, 0, noise_margin)
+                        for dg in (-noise_margin, 0, noise_margin) for dr in (-noise_margin, 0, noise_margin)])
+    for hsv in candidates:
+        bgr = cv2.cvtColor(np.uint8([[hsv]]), cv2.COLOR_HSV2BGR)[0][0]
+        noisy_bgr = np.clip(bgr.astype(int) + offsets, 0, 255).astype(np.uint8)
+        round_trip = cv2.cvtColor(noisy_bgr[np.newaxis], cv2.COLOR_BGR2HSV)[0]
+        inside = lambda bounds: np.all((round_trip >= bounds["lower"]) & (round_trip <= bounds["upper"]), axis=1)
+        if np.all(inside(color_ranges[color_name])) and not any(np.any(inside(bounds)) for name, bounds in color_ranges.items() if name != color_name):
+            return tuple(int(c) for c in bgr)
+    raise ValueError(f"No colour found for '{color_name}' that does not overlap the other colour ranges.")
+
+
+class SimCamera:
+    # Stands in for picamera2.Picamera2, showing one station's table
+    def __init__(self, sim):
+        self.sim = sim
+        self.last_capture = 0.0
+
+    def create_still_configuration(self, main=None, **kwargs):
+        return {'main': main}
+
+    def configure(self, config):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def capture_array(self, name="main"):
+        # Pace captures like the real sensor
+        wait = 1.0 / self.sim.args.camera_fps - (time.monotonic() - self.last_capture)
+        if wait > 0:
+            time.sleep(wait)
+        self.last_capture = time.monotonic()
+        return self.sim.scene.render()
+
+
+class SimArm:
+    # Stands in for the HC-05 + STM32 + Braccio behind BraccioBluetoothSender
+    def __init__(self, sim):
+        self.sim = sim
+        self.args = sim.args
+        self.incoming = queue.Queue()
+        self.angles = HOME_ANGLES
+        self.busy = False
+        self.last_ready_time = None
+
+    def connect(self):
+        self._send_ready() # the STM32 reports ready once at boot
+
+    def _send_ready(self):
+        self.busy = False
+        self.last_ready_time = time.monotonic()
+        self.incoming.put(READY_MESSAGE)
+
+    def _move_time(self, start, end):
+        speeds = (self.args.base_speed, self.args.shoulder_speed, self.args.elbow_speed)
+        return max(abs(b - a) / speed for a, b, speed in zip(start, end, speeds))
+
+    def _forward_kinematics(self, base, shoulder, elbow):
+        solver = self.sim.main.braccio_solver
+        elbow_rad = np.radians(elbow + 90)
+        D = np.sqrt(solver.L1**2 + solver.L2**2 - 2 * solver.L1 * solver.L2 * np.cos(elbow_rad))
+        shoulder_D_rad = np.arccos(np.clip((solver.L1**2 + D**2 - solver.L2**2) / (2 * solver.L1 * D), -1.0, 1.0))
+        alpha_rad = np.radians(shoulder + 5) - shoulder_D_rad
+        R = D * np.cos(alpha_rad)
+        azimuth = np.radians(90 - base)
+        return R * np.cos(azimuth), R * np.sin(azimuth)
+
+    def receive(self, data):
+        received_time = time.monotonic()
+        message = data.decode('utf-8').strip()
+        try:
+            base, shoulder, elbow, obj_class = (int(value) for value in message.split(","))
+        except ValueError:
+            print(f"SIM ARM: Ignoring malformed message '{message}'")
+            return
+        if self.busy:
+            print(f"SIM ARM: Command '{message}' received while moving, ignored")
+            return
+        self.busy = True
+
+        target = (base, shoulder, elbow)
+        bin_angles = BIN_ANGLES.get(obj_class, HOME_ANGLES)
+        reach_time = self._move_time(self.angles, target)
+        place_time = self.args.grip_time + self._move_time(target, bin_angles) + self.args.release_time + self._move_time(bin_angles, HOME_ANGLES)
+
+        pick = {
+            'ready_time': self.last_ready_time,
+            'command_time': received_time,
+            'reach_time': reach_time,
+            'place_time': place_time,
+            'angles': target,
+            'obj_class': obj_class,
+        }
+        self.sim.picks.append(pick)
+
+        def grip():
+            x_mm, y_mm = self._forward_kinematics(*target)
+            block, distance = self.sim.scene.remove_nearest(x_mm, y_mm, self.args.pick_tolerance_mm)
+            pick['picked'] = block is not None
+            pick['error_mm'] = distance
+            pick['grip_time'] = time.monotonic()
+            if block is None:
+                print(f"SIM ARM: Mis-pick at X={x_mm:.0f}mm, Y={y_mm:.0f}mm")
+
+        def done():
+            self.angles = HOME_ANGLES
+            self._send_ready()
+            self.sim.check_done()
+
+        threading.Timer(reach_time, grip).start()
+        threading.Timer(reach_time + place_time, done).start()
+
+    def read(self, buffer_size):
+        return self.incoming.get()
+
+    def close(self):
+        pass # leave SortCell.ready_loop blocked, it is a daemon thread
+
+
+class SimPhone:
+    # Stands in for the Android app connected to AndroidBluetoothServer
+    def __init__(self, sim):
+        self.sim = sim
+        self.incoming = queue.Queue()
+        self.messages = []
+        self.start_time = None
+
+    def connect(self):
+        def press_start():
+            self.start_time = time.monotonic()
+            self.incoming.put(b"1")
+        threading.Timer(self.sim.args.phone_start_delay, press_start).start()
+
+    def receive(self, data):
+        self.messages.append((time.monotonic(), data.decode('utf-8').strip()))
+
+    def read(self, buffer_size):
+        return self.incoming.get()
+
+    def close(self):
+        pass
+
+
+class SimStation:
+    # One simulated table, arm and phone
+    def __init__(self, args, index, mac_address, android_port):
+        self.args = args
+        self.index = index
+        self.mac_address = mac_address
+        self.android_port = android_port
+        self.done = threading.Event()
+        self.scene = SimScene(args, args.seed + index)
+        self.arm = SimArm(self)
+        self.phone = SimPhone(self)
+        self.picks = []
+        self.main = None
+        self.cell = None
+
+    def finish(self):
+        # Ends the run the same way the orchestrator does, so a normal finish logs no errors
+        self.done.set()
+        if self.cell:
+            self.cell.stop()
+
+    def check_done(self):
+        if self.scene.remaining() == 0:
+            print(f"SIM: Station {self.index}: all blocks sorted.")
+            self.finish()
+        elif self.args.max_picks is not None and len(self.picks) >= self.args.max_picks:
+            print(f"SIM: Station {self.index}: reached {self.args.max_picks} pick attempts.")
+            self.finish()
+
+
+def make_bluetooth_module(sim):
+    module = types.ModuleType("bluetooth")
+    module.RFCOMM = 3
+
+    class BluetoothSocket:
+        def __init__(self, proto=module.RFCOMM, endpoint=None):
+            self.endpoint = endpoint
+            self.notify_read = None
+            self.notify_write = None
+
+        def connect(self, address):
+            # Each arm is found by its HC-05 MAC address
+            station = sim.station_by_mac[address[0]]
+            self.endpoint = station.arm
+            station.arm.connect()
+
+        def bind(self, address):
+            self.port = address[1]
+
+        def listen(self, backlog):
+            # A real socket pair so select.select() in accept_connection works
+            self.notify_read, self.notify_write = socket.socketpair()
+            self.notify_write.send(b"c") # the phone connects straight away
+
+        def fileno(self):
+            return self.notify_read.fileno()
+
+        def accept(self):
+            # Each phone is found by the server port it connects to
+            self.notify_read.recv(1)
+            station = sim.station_by_port[self.port]
+            station.phone.connect()
+            return BluetoothSocket(endpoint=station.phone), (sim.main.PHONE_MAC, self.port)
+
+        def send(self, data):
+            self.endpoint.receive(data)
+            return len(data)
+
+        def recv(self, buffer_size):
+            return self.endpoint.read(buffer_size)
+
+        def close(self):
+            if self.endpoint:
+                self.endpoint.close()
+            for sock in (self.notify_read, self.notify_write):
+                if sock:
+                    sock.close()
+
+    module.BluetoothSocket = BluetoothSocket
+    return module
+
+def make_picamera2_module(sim):
+    module = types.ModuleType("picamera2")
+    module.Picamera2 = lambda camera_num=0, **kwargs: SimCamera(sim.stations[camera_num])
+    module.Preview = types.SimpleNamespace(QTGL=None, NULL=None)
+    return module
+
+
+class CellSimulator:
+    def __init__(self, args):
+        self.args = args
+        self.stations = []
+        self.station_by_mac = {}
+        self.station_by_port = {}
+        self.detection_times = []
+        self.main = None
+
+    def _write_calibration(self, path):
+        camera_matrix = np.array([
+            [FOCAL_LENGTH_PX, 0, IMAGE_SIZE[0] / 2],
+            [0, FOCAL_LENGTH_PX, IMAGE_SIZE[1] / 2],
+            [0, 0, 1]
+        ])
+        np.savez(path, mtx=camera_matrix, dist=np.zeros((1, 5)))
+
+    def _add_station(self, mac_address, android_port):
+        station = SimStation(self.args, len(self.stations), mac_address, android_port)
+        self.stations.append(station)
+        self.station_by_mac[mac_address] = station
+        self.station_by_port[android_port] = station
+        return station
+
+    def _time_detector(self, detector):
+        # Time every call into the real detector
+        process_frame = detector.process_frame
+        def timed_process_frame(frame):
+            start = time.perf_counter()
+            result = process_frame(frame)
+            self.detection_times.append(time.perf_counter() - start)
+            return result
+        detector.process_frame = timed_process_frame
+
+    def _cell_configs(self):
+        # Every station gets main.py's settings with its own camera, arm, app port and recording
+        main = self.main
+        return [{
+            'name': f"cell-{station.index}",
+            'camera': {'type': 'picamera2', 'index': station.index, 'size': list(IMAGE_SIZE)},
+            'calibration_file': main.CALIBRATION_FILE,
+            'aruco_dict': main.ARUCO_DICT_TYPE,
+            'marker_length_mm': main.MARKER_LENGTH_MM,
+            'min_object_area_pixels': main.MIN_OBJECT_AREA_PIXELS,
+            'color_ranges': {name: {'lower': bounds['lower'].tolist(), 'upper': bounds['upper'].tolist()}
+                             for name, bounds in main.COLOR_RANGES.items()},
+            'marker_in_robot_frame_mm': [main.MARKER_X_IN_ROBOT_FRAME_MM, main.MARKER_Y_IN_ROBOT_FRAME_MM, main.MARKER_Z_IN_ROBOT_FRAME_MM],
+            'braccio': {'mac_address': station.mac_address, 'port': main.BLUETOOTH_PORT},
+            'android': {'port': station.android_port, 'phone_mac': main.PHONE_MAC},
+            'governor_policy': main.GOVERNOR_POLICY,
+            'show_display': self.args.show,
+            'stats_interval_frames': main.MOTION_STATS_INTERVAL_FRAMES,
+            'flight_recorder_file': f"flight_recorder_cell-{station.index}.bin",
+            'flight_recorder_size_mb': main.FLIGHT_RECORDER_SIZE_MB,
+            'flight_recorder_frame_scale': main.FLIGHT_RECORDER_FRAME_SCALE,
+            'flight_recorder_frame_format': main.FLIGHT_RECORDER_FRAME_FORMAT,
+            'flight_recorder_jpeg_quality': main.FLIGHT_RECORDER_JPEG_QUALITY,
+            'flight_recorder_min_frame_interval_s': main.FLIGHT_RECORDER_MIN_FRAME_INTERVAL_S
+        } for station in self.stations]
+
+    def run(self):
+        work_dir = tempfile.mkdtemp(prefix="cell_sim_")
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        os.chdir(work_dir) # main.py loads camera_calibration.npz and writes its flight recording here
+        self._write_calibration("camera_calibration.npz")
+
+        # Stations must exist before main.py opens camera 0. A single station uses main.py's own
+        # addresses, several stations get one arm MAC and one app port each.
+        for index in range(self.args.cells):
+            if self.args.cells == 1:
+                self._add_station(None, None)
+            else:
+                self._add_station(f"00:00:00:00:00:{index:02X}", 10 + index)
+
+        sys.modules["picamera2"] = make_picamera2_module(self)
+        sys.modules["bluetooth"] = make_bluetooth_module(self)
+        import main
+        self.main = main
+        if self.args.cells == 1:
+            self.station_by_mac = {main.HC05_MAC_ADDRESS: self.stations[0]}
+            self.station_by_port = {main.PORT: self.stations[0]}
+
+        for station in self.stations:
+            station.main = main
+            station.scene.setup(main)
+        print(f"\nSIM: {self.args.cells} station(s) with {self.args.blocks} blocks each, working directory {work_dir}")
+
+        if self.args.cells == 1:
+            main.cell.show_display = self.args.show
+            self.stations[0].cell = main.cell
+            self._time_detector(main.detector)
+        else:
+            import cell_orchestrator
+            cells = cell_orchestrator.build_cells(self._cell_configs())
+            for cell in cells:
+                self.stations[int(cell.name.split("-")[1])].cell = cell
+                self._time_detector(cell.detector)
+
+        def stop_all():
+            for station in self.stations:
+                station.finish()
+        duration_timer = threading.Timer(self.args.duration, stop_all)
+        duration_timer.daemon = True
+        duration_timer.start()
+
+        run_start = time.monotonic()
+        if self.args.cells == 1:
+            main.main()
+        else:
+            cell_orchestrator.run_cells(cells, self.args.workers)
+        wall_time_s = time.monotonic() - run_start
+        shutdown_logging() # flush the log so the report is printed after it
+        self.report(wall_time_s)
+
+    def _station_summary(self, station):
+        completed = [pick for pick in station.picks if 'grip_time' in pick]
+        successful = [pick for pick in completed if pick['picked']]
+        start_time = station.phone.start_time or 0.0
+        last_time = max((pick['command_time'] + pick['reach_time'] + pick['place_time'] for pick in completed), default=start_time)
+
+        # The boot-time ready arrives before the app starts the system, count from whichever is later
+        decision_latencies = [pick['command_time'] - max(pick['ready_time'], start_time) for pick in completed]
+        # Colour messages to the app follow each command, match them in order
+        notify_latencies = []
+        message_times = [message_time for message_time, _ in station.phone.messages]
+        for pick in completed:
+            later = [message_time for message_time in message_times if message_time >= pick['command_time']]
+            if later:
+                notify_latencies.append(later[0] - pick['command_time'])
+        return completed, successful, start_time, last_time, decision_latencies, notify_latencies
+
+    def report(self, wall_time_s):
+        summaries = [self._station_summary(station) for station in self.stations]
+        completed = [pick for summary in summaries for pick in summary[0]]
+        successful = [pick for summary in summaries for pick in summary[1]]
+        start_time = min(summary[2] for summary in summaries)
+        sorting_time_s = max(max(summary[3] for summary in summaries) - start_time, 1e-6)
+        decision_latencies = [latency for summary in summaries for latency in summary[4]]
+        notify_latencies = [latency for summary in summaries for latency in summary[5]]
+
+        def summary(values):
+            if not values:
+                return "n/a"
+            return f"mean {np.mean(values) * 1000:.0f} ms, p95 {np.percentile(values, 95) * 1000:.0f} ms"
+
+        print("\n--- Cell Simulator Report ---")
+        print(f"Wall time: {wall_time_s:.1f} s, sorting time: {sorting_time_s:.1f} s")
+        print(f"Pick attempts: {len(completed)}, successful: {len(successful)}, blocks left: {sum(station.scene.remaining() for station in self.stations)}")
+        print(f"Throughput: {len(successful) / sorting_time_s * 60:.2f} picks/min")
+        if len(self.stations) > 1:
+            for station, (_, station_successful, station_start, station_last, _, _) in zip(self.stations, summaries):
+                station_time_s = max(station_last - station_start, 1e-6)
+                print(f"  Station {station.index}: {len(station_successful)} picks, {len(station_successful) / station_time_s * 60:.2f} picks/min")
+        print("Latency breakdown per pick:")
+        print(f"  Ready -> command (perception + IK + BT): {summary(decision_latencies)}")
+        print(f"  Arm reach:                              {summary([pick['reach_time'] for pick in completed])}")
+        print(f"  Grip, place and return:                 {summary([pick['place_time'] for pick in completed])}")
+        print(f"  Command -> app notification:            {summary(notify_latencies)}")
+        print(f"Detection: {len(self.detection_times)} frames, {summary(self.detection_times)}")
+        if successful:
+            print(f"Pick position error: mean {np.mean([pick['error_mm'] for pick in successful]):.1f} mm")
+        print("-------------------------------------------\n")
+
+
+if __name__ == "__main__":
+    CellSimulator(parse_args()).run()
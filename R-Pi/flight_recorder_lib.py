@@ -0,0 +1,318 @@
+import itertools
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# --- File layout ---
+# [file header][metadata block][ring data region]
+FILE_MAGIC = b"CSFRING1"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<8sIIQQQQQ") # magic, version, metadata_len, capacity, head, tail, count, next_seq
+FILE_HEADER_SIZE = 64
+METADATA_SIZE = 4096
+DATA_OFFSET = FILE_HEADER_SIZE + METADATA_SIZE
+
+RECORD_MAGIC = 0x43455246 # "FREC"
+PAD_MAGIC = 0x44415046    # "FPAD", rest of the region up to the end is unused
+RECORD_HEADER = struct.Struct("<IQdBII") # magic, seq, timestamp, type, payload_len, crc32
+
+RECORD_FRAME = 1
+RECORD_DETECTIONS = 2
+RECORD_ANGLES = 3
+RECORD_MESSAGE = 4
+
+RECORD_TYPE_NAMES = {
+    RECORD_FRAME: "frame",
+    RECORD_DETECTIONS: "detections",
+    RECORD_ANGLES: "angles",
+    RECORD_MESSAGE: "message",
+}
+
+FRAME_HEADER = struct.Struct("<HH") # original width, original height
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _RingFile:
+    def __init__(self, path, capacity_bytes=None, metadata=None):
+        self.path = path
+        self.writable = capacity_bytes is not None
+
+        if self.writable:
+            metadata_bytes = json.dumps(metadata or {}, default=_to_json).encode('utf-8')
+            if len(metadata_bytes) > METADATA_SIZE:
+                raise ValueError(f"Recorder metadata is {len(metadata_bytes)} bytes, limit is {METADATA_SIZE}.")
+
+            with open(path, "wb") as f:
+                f.truncate(DATA_OFFSET + capacity_bytes)
+            self.file = open(path, "r+b")
+            self.mm = mmap.mmap(self.file.fileno(), DATA_OFFSET + capacity_bytes)
+            self.mm[FILE_HEADER_SIZE:FILE_HEADER_SIZE + len(metadata_bytes)] = metadata_bytes
+
+            self.metadata_len = len(metadata_bytes)
+            self.capacity = capacity_bytes
+            self.head = 0
+            self.tail = 0
+            self.count = 0
+            self.next_seq = 0
+            self._write_header()
+        else:
+            self.file = open(path, "rb")
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.metadata_len, self.capacity, self.head, self.tail, self.count, self.next_seq = \
+                FILE_HEADER.unpack_from(self.mm, 0)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError(f"'{path}' is not a flight recording (magic={magic!r}, version={version}).")
+
+    def _write_header(self):
+        FILE_HEADER.pack_into(self.mm, 0, FILE_MAGIC, FILE_VERSION, self.metadata_len, self.capacity,
+                              self.head, self.tail, self.count, self.next_seq)
+
+    def metadata(self):
+        return json.loads(bytes(self.mm[FILE_HEADER_SIZE:FILE_HEADER_SIZE + self.metadata_len]).decode('utf-8'))
+
+    def _is_pad(self, offset):
+        if offset + RECORD_HEADER.size > self.capacity:
+            return True
+        magic = struct.unpack_from("<I", self.mm, DATA_OFFSET + offset)[0]
+        return magic == PAD_MAGIC
+
+    def _evict_tail(self):
+        if self._is_pad(self.tail):
+            self.tail = 0
+            return
+        payload_len = RECORD_HEADER.unpack_from(self.mm, DATA_OFFSET + self.tail)[4]
+        self.tail += RECORD_HEADER.size + payload_len
+        if self.tail >= self.capacity:
+            self.tail = 0
+        self.count -= 1
+
+    def append(self, seq, timestamp, record_type, payload):
+        size = RECORD_HEADER.size + len(payload)
+        if size > self.capacity // 2:
+            return False
+
+        # Not enough contiguous room before the end: pad and wrap to the start
+        if self.head + size > self.capacity:
+            while self.count > 0 and self.tail >= self.head:
+                self._evict_tail()
+            if self.head + RECORD_HEADER.size <= self.capacity:
+                struct.pack_into("<I", self.mm, DATA_OFFSET + self.head, PAD_MAGIC)
+            self.head = 0
+
+        # Drop the oldest records that overlap the space we are about to write
+        while self.count > 0 and self.head <= self.tail < self.head + size:
+            self._evict_tail()
+        if self.count == 0:
+            self.tail = self.head
+
+        start = DATA_OFFSET + self.head
+        RECORD_HEADER.pack_into(self.mm, start, RECORD_MAGIC, seq, timestamp, record_type, len(payload), zlib.crc32(payload))
+        self.mm[start + RECORD_HEADER.size:start + size] = payload
+
+        self.head += size
+        self.count += 1
+        self.next_seq = seq + 1
+        self._write_header()
+        return True
+
+    def records(self):
+        offset = self.tail
+        for _ in range(self.count):
+            if self._is_pad(offset):
+                offset = 0
+            magic, seq, timestamp, record_type, payload_len, crc = RECORD_HEADER.unpack_from(self.mm, DATA_OFFSET + offset)
+            start = DATA_OFFSET + offset + RECORD_HEADER.size
+            payload = bytes(self.mm[start:start + payload_len])
+            if magic != RECORD_MAGIC or zlib.crc32(payload) != crc:
+                logger.warning("Corrupt flight record at offset %s, stopping read.", offset)
+                return
+            yield seq, timestamp, record_type, payload
+            offset += RECORD_HEADER.size + payload_len
+            if offset >= self.capacity:
+                offset = 0
+
+    def close(self):
+        if self.mm.closed:
+            return
+        if self.writable:
+            self.mm.flush()
+        self.mm.close()
+        self.file.close()
+
+
+class FlightRecorder:
+    def __init__(self, path, capacity_bytes=64 * 1024 * 1024, frame_scale=0.5, jpeg_quality=70,
+                 min_frame_interval_s=0.0, queue_size=64, metadata=None, frame_format="jpeg"):
+        if frame_format not in ("jpeg", "png"):
+            raise ValueError(f"Unknown frame format '{frame_format}'. Available: jpeg, png")
+        self.path = path
+        self.capacity_bytes = capacity_bytes
+        self.frame_scale = frame_scale
+        self.jpeg_quality = jpeg_quality
+        self.frame_format = frame_format
+        self.min_frame_interval_s = min_frame_interval_s
+        # Stored with the recording so flight_replay.py knows how lossy the frames are
+        self.metadata = {**(metadata or {}), 'frame_scale': frame_scale, 'frame_format': frame_format}
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.seq_counter = itertools.count()
+        self.seq_lock = threading.Lock()
+        self.last_frame_time = 0.0
+        self.ring = None
+        self.writer_thread = None
+
+        self.records_written = 0
+        self.records_dropped = 0
+
+        logger.info("FlightRecorder initialized: %s, %.0f MB ring, frame scale=%s, %s frames",
+                    self.path, self.capacity_bytes / (1024 * 1024), self.frame_scale,
+                    f"JPEG quality={self.jpeg_quality}" if self.frame_format == "jpeg" else "lossless PNG")
+
+    def start(self):
+        if self.writer_thread:
+            return True
+        try:
+            # Keep the previous run's recording around in case it holds the mis-pick
+            if os.path.exists(self.path):
+                os.replace(self.path, self.path + ".prev")
+            self.ring = _RingFile(self.path, self.capacity_bytes, self.metadata)
+        except Exception as e:
+            logger.error("Failed to start flight recorder: %s", e)
+            self.ring = None
+            return False
+
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+        return True
+
+    def _next_seq(self):
+        with self.seq_lock:
+            return next(self.seq_counter)
+
+    def _enqueue(self, record_type, item):
+        if not self.writer_thread:
+            return None
+        seq = self._next_seq()
+        try:
+            self.queue.put_nowait((seq, time.time(), record_type, item))
+        except queue.Full:
+            # Never block the control loop, losing a record is acceptable
+            self.records_dropped += 1
+            return None
+        return seq
+
+    def record_frame(self, frame):
+        now = time.monotonic()
+        if now - self.last_frame_time < self.min_frame_interval_s:
+            return None
+        self.last_frame_time = now
+        # Downscale here so a writer that falls behind holds small frames in the queue, not full camera frames
+        height, width = frame.shape[:2]
+        small_frame = frame
+        if self.frame_scale != 1.0:
+            small_frame = cv2.resize(frame, None, fx=self.frame_scale, fy=self.frame_scale, interpolation=cv2.INTER_AREA)
+        elif not frame.flags.owndata:
+            small_frame = frame.copy() # the camera may reuse its buffer
+        return self._enqueue(RECORD_FRAME, (width, height, small_frame))
+
+    def record_detections(self, frame_id, aruco_data, detected_objects):
+        return self._enqueue(RECORD_DETECTIONS, {
+            'frame_id': frame_id,
+            'aruco_data': aruco_data,
+            'detected_objects': detected_objects
+        })
+
+    def record_angles(self, frame_id, target, detected_class, joint_angles):
+        return self._enqueue(RECORD_ANGLES, {
+            'frame_id': frame_id,
+            'target': target,
+            'detected_class': detected_class,
+            'joint_angles': joint_angles
+        })
+
+    def record_message(self, channel, message):
+        return self._enqueue(RECORD_MESSAGE, {
+            'channel': channel,
+            'message': message
+        })
+
+    def _encode(self, record_type, item):
+        if record_type == RECORD_FRAME:
+            width, height, small_frame = item
+            if self.frame_format == "png":
+                ok, image = cv2.imencode(".png", small_frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            else:
+                ok, image = cv2.imencode(".jpg", small_frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                return None
+            return FRAME_HEADER.pack(width, height) + image.tobytes()
+        return json.dumps(item, default=_to_json).encode('utf-8')
+
+    def _writer_loop(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                break
+            seq, timestamp, record_type, item = entry
+            try:
+                payload = self._encode(record_type, item)
+                if payload is not None and self.ring.append(seq, timestamp, record_type, payload):
+                    self.records_written += 1
+                else:
+                    self.records_dropped += 1
+            except Exception as e:
+                logger.error("Flight recorder failed to write record %s: %s", seq, e)
+                self.records_dropped += 1
+
+    def stop(self):
+        if not self.writer_thread:
+            return
+        self.queue.put(None)
+        self.writer_thread.join()
+        self.writer_thread = None
+        self.ring.close()
+        self.ring = None
+        logger.info("FlightRecorder stopped: %s records written, %s dropped.", self.records_written, self.records_dropped)
+
+
+class FlightRecording:
+    def __init__(self, path):
+        self.path = path
+        self.ring = _RingFile(path)
+        self.metadata = self.ring.metadata()
+
+    def records(self):
+        # Records are yielded oldest first, payloads decoded
+        for seq, timestamp, record_type, payload in sorted(self.ring.records(), key=lambda record: record[0]):
+            yield seq, timestamp, record_type, self.decode(record_type, payload)
+
+    @staticmethod
+    def decode(record_type, payload):
+        if record_type == RECORD_FRAME:
+            width, height = FRAME_HEADER.unpack_from(payload, 0)
+            small_frame = cv2.imdecode(np.frombuffer(payload[FRAME_HEADER.size:], dtype=np.uint8), cv2.IMREAD_COLOR)
+            if small_frame.shape[1] == width and small_frame.shape[0] == height:
+                return small_frame
+            # Scale back up so the camera matrix from calibration still applies
+            return cv2.resize(small_frame, (width, height), interpolation=cv2.INTER_LINEAR)
+        return json.loads(payload.decode('utf-8'))
+
+    def close(self):
+        self.ring.close()
@@ -0,0 +1,229 @@
+import argparse
+import logging
+import cv2
+import numpy as np
+from aruco_detector_lib import ObjectDetector
+from braccio_robot_lib import BraccioKinematicsSolver
+from flight_recorder_lib import FlightRecording, RECORD_FRAME, RECORD_DETECTIONS, RECORD_ANGLES, RECORD_MESSAGE
+from logging_lib import setup_logging
+
+# Replays a flight_recorder.bin through the same detector and solver used by main.py.
+# Records are processed strictly in sequence order with no threads or timing, so a
+# replay of the same recording always produces the same output.
+#
+# By default frames are stored as downscaled JPEGs, which is enough to reproduce the
+# colour detections but not the ArUco pose: re-estimating it can flip the marker by
+# tens of degrees. The replayed centroids are therefore re-projected with the recorded
+# pose, so a pick made from a bad pose is reproduced as it happened, and the tolerances
+# are scaled by the frame downscale. Pose drift is only checked for lossless (PNG, scale
+# 1.0) recordings, on lossy frames it is expected and says nothing about the live run.
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a flight recording through ObjectDetector and BraccioKinematicsSolver.")
+    parser.add_argument("recording", help="Path to the flight recorder file (e.g. flight_recorder.bin)")
+    parser.add_argument("--calibration", help="Override the calibration file stored in the recording")
+    parser.add_argument("--show", action="store_true", help="Display the replayed frames")
+    parser.add_argument("--step", action="store_true", help="Wait for a key press after every frame (implies --show)")
+    parser.add_argument("--centroid-tolerance-px", type=float, default=3.0,
+                        help="Allowed centroid difference between recorded and replayed detections, in full frame pixels at scale 1.0")
+    parser.add_argument("--angle-tolerance-deg", type=float, default=0.5,
+                        help="Allowed joint angle difference between recorded and replayed solutions")
+    parser.add_argument("--position-tolerance-mm", type=float, default=3.0,
+                        help="Allowed difference between recorded and replayed 3D positions and pick targets at scale 1.0")
+    parser.add_argument("--pose-tolerance-deg", type=float, default=1.0,
+                        help="Allowed marker rotation difference before pose drift is reported (lossless recordings only)")
+    return parser.parse_args()
+
+def build_detector(metadata, calibration_file=None):
+    color_ranges = {
+        color_name: {
+            "lower": np.array(bounds["lower"]),
+            "upper": np.array(bounds["upper"])
+        }
+        for color_name, bounds in metadata['color_ranges'].items()
+    }
+    return ObjectDetector(
+        calibration_file=calibration_file or metadata['calibration_file'],
+        aruco_dict_type=metadata['aruco_dict_type'],
+        marker_length_mm=metadata['marker_length_mm'],
+        color_ranges=color_ranges,
+        min_object_area_pixels=metadata['min_object_area_pixels']
+    )
+
+def get_target(rel_3d_from_aruco_mm, marker_in_robot_frame_mm):
+    # Same conversion as get_coords() in main.py
+    return tuple(marker_in_robot_frame_mm[i] + rel_3d_from_aruco_mm[i] for i in range(3))
+
+def get_nearest_target(targets, target):
+    # The pick controller may skip the block already being picked, so match by position instead of taking the first object
+    targets = [t for t in targets if t is not None]
+    if not targets:
+        return None
+    return min(targets, key=lambda t: np.hypot(t[0] - target[0], t[1] - target[1]))
+
+def reproject(detector, objects, aruco_data):
+    # 3D positions of the replayed centroids under a given (usually the recorded) marker pose
+    if not aruco_data:
+        return [None for obj in objects]
+    return [detector.get_rel_3d_from_aruco(obj['centroid_px'], aruco_data['rvec'], aruco_data['tvec']) for obj in objects]
+
+def compare_detections(recorded_objects, replayed_objects, reprojected, tolerance_px, tolerance_mm):
+    if len(recorded_objects) != len(replayed_objects):
+        return f"object count {len(recorded_objects)} recorded vs {len(replayed_objects)} replayed"
+    for recorded, replayed, position in zip(recorded_objects, replayed_objects, reprojected):
+        if recorded['color_name'] != replayed['color_name']:
+            return f"colour {recorded['color_name']} recorded vs {replayed['color_name']} replayed"
+        dx = recorded['centroid_px'][0] - replayed['centroid_px'][0]
+        dy = recorded['centroid_px'][1] - replayed['centroid_px'][1]
+        if np.hypot(dx, dy) > tolerance_px:
+            return f"{recorded['color_name']} centroid {tuple(recorded['centroid_px'])} recorded vs {tuple(replayed['centroid_px'])} replayed"
+        recorded_position = recorded['rel_3d_from_aruco_mm']
+        if (recorded_position is None) != (position is None):
+            return f"{recorded['color_name']} position {recorded_position} recorded vs {position} replayed"
+        if position is not None and np.linalg.norm(np.subtract(recorded_position, position)) > tolerance_mm:
+            return (f"{recorded['color_name']} position ({recorded_position[0]:.0f},{recorded_position[1]:.0f}) recorded vs "
+                    f"({position[0]:.0f},{position[1]:.0f}) replayed")
+    return None
+
+def compare_pose(recorded_aruco, replayed_aruco, recorded_objects, replayed_objects, tolerance_mm, tolerance_deg):
+    if not recorded_aruco or not replayed_aruco:
+        if not recorded_aruco and not replayed_aruco:
+            return None
+        return "marker " + ("found" if recorded_aruco else "not found") + " when recorded, " + ("found" if replayed_aruco else "not found") + " on replay"
+
+    tvec_drift_mm = np.linalg.norm(np.subtract(np.ravel(recorded_aruco['tvec']), np.ravel(replayed_aruco['tvec'])))
+    R_recorded, _ = cv2.Rodrigues(np.asarray(recorded_aruco['rvec'], dtype=np.float64))
+    R_replayed, _ = cv2.Rodrigues(np.asarray(replayed_aruco['rvec'], dtype=np.float64))
+    cos_angle = np.clip((np.trace(R_recorded.T @ R_replayed) - 1) / 2, -1.0, 1.0)
+    rotation_drift_deg = np.degrees(np.arccos(cos_angle))
+
+    target_drift_mm = 0.0
+    for recorded, replayed in zip(recorded_objects, replayed_objects):
+        if recorded['rel_3d_from_aruco_mm'] is not None and replayed['rel_3d_from_aruco_mm'] is not None:
+            drift = np.linalg.norm(np.subtract(recorded['rel_3d_from_aruco_mm'], replayed['rel_3d_from_aruco_mm']))
+            target_drift_mm = max(target_drift_mm, drift)
+
+    if tvec_drift_mm > tolerance_mm or rotation_drift_deg > tolerance_deg or target_drift_mm > tolerance_mm:
+        return f"tvec moved {tvec_drift_mm:.1f} mm, rotation {rotation_drift_deg:.2f} deg, targets moved up to {target_drift_mm:.1f} mm"
+    return None
+
+def compare_targets(recorded_target, replayed_target, tolerance_mm):
+    if replayed_target is None:
+        return "no replayed detection near the recorded target"
+    distance_mm = np.linalg.norm(np.subtract(recorded_target, replayed_target))
+    if distance_mm > tolerance_mm:
+        return (f"target ({recorded_target[0]:.0f},{recorded_target[1]:.0f}) recorded vs "
+                f"({replayed_target[0]:.0f},{replayed_target[1]:.0f}) replayed, {distance_mm:.1f} mm apart")
+    return None
+
+def compare_angles(recorded_angles, replayed_angles, tolerance_deg):
+    if recorded_angles is None or replayed_angles is None:
+        if recorded_angles is replayed_angles:
+            return None
+        return f"angles {recorded_angles} recorded vs {replayed_angles} replayed"
+    for joint in recorded_angles:
+        if abs(recorded_angles[joint] - replayed_angles[joint]) > tolerance_deg:
+            return f"{joint} {recorded_angles[joint]:.1f} recorded vs {replayed_angles[joint]:.1f} replayed"
+    return None
+
+def main():
+    args = parse_args()
+    show = args.show or args.step
+    setup_logging(level=logging.WARNING)
+
+    recording = FlightRecording(args.recording)
+    metadata = recording.metadata
+    marker_in_robot_frame_mm = metadata['marker_in_robot_frame_mm']
+
+    # Recordings made before these keys were stored used the JPEG, scale 0.5 default
+    frame_scale = metadata.get('frame_scale', 0.5)
+    frame_format = metadata.get('frame_format', "jpeg")
+    lossless = frame_format == "png" and frame_scale == 1.0
+    # A pixel of the stored frame covers 1/frame_scale pixels of the camera frame
+    centroid_tolerance_px = args.centroid_tolerance_px / frame_scale
+    position_tolerance_mm = args.position_tolerance_mm / frame_scale
+    print(f"Frames stored as {frame_format} at scale {frame_scale}: centroid tolerance {centroid_tolerance_px:.1f} px, "
+          f"position tolerance {position_tolerance_mm:.1f} mm, marker pose " + ("checked" if lossless else "not checked (lossy frames)"))
+
+    detector = build_detector(metadata, args.calibration)
+    braccio_solver = BraccioKinematicsSolver()
+
+    replayed_detections = {}
+    recorded_poses = {}
+    counts = {'frames': 0, 'detections': 0, 'detection_mismatches': 0, 'pose_drifts': 0, 'angles': 0, 'angle_mismatches': 0, 'messages': 0}
+
+    try:
+        for seq, timestamp, record_type, payload in recording.records():
+            if record_type == RECORD_FRAME:
+                counts['frames'] += 1
+                display_frame, aruco_data, detected_objects = detector.process_frame(payload)
+                replayed_detections[seq] = (aruco_data, detected_objects)
+                if show:
+                    cv2.imshow("Flight Replay", display_frame)
+                    key = cv2.waitKey(0 if args.step else 1) & 0xFF
+                    if key == ord('q'):
+                        break
+
+            elif record_type == RECORD_DETECTIONS:
+                counts['detections'] += 1
+                recorded_poses[payload['frame_id']] = payload['aruco_data']
+                if payload['frame_id'] not in replayed_detections:
+                    continue # frame was not recorded or has been overwritten in the ring
+                replayed_aruco, replayed_objects = replayed_detections[payload['frame_id']]
+
+                # Colour detections are checked under the recorded pose, pose drift is reported separately
+                reprojected = reproject(detector, replayed_objects, payload['aruco_data'])
+                mismatch = compare_detections(payload['detected_objects'], replayed_objects, reprojected,
+                                              centroid_tolerance_px, position_tolerance_mm)
+                if mismatch:
+                    counts['detection_mismatches'] += 1
+                    print(f"[{seq}] {timestamp:.3f} Detection mismatch on frame {payload['frame_id']}: {mismatch}")
+
+                if not lossless:
+                    continue
+                drift = compare_pose(payload['aruco_data'], replayed_aruco, payload['detected_objects'], replayed_objects,
+                                     args.position_tolerance_mm, args.pose_tolerance_deg)
+                if drift:
+                    counts['pose_drifts'] += 1
+                    print(f"[{seq}] {timestamp:.3f} Pose drift on frame {payload['frame_id']}: {drift}")
+
+            elif record_type == RECORD_ANGLES:
+                counts['angles'] += 1
+                target = payload['target']
+                print(f"[{seq}] {timestamp:.3f} Pick class {payload['detected_class']} at "
+                      f"X={target[0]:.0f}mm, Y={target[1]:.0f}mm, Z={target[2]:.0f}mm -> {payload['joint_angles']}")
+
+                # Re-solve from the recorded target, the solver is deterministic so this must match exactly
+                mismatch = compare_angles(payload['joint_angles'], braccio_solver.calculate_joint_angles(*target), args.angle_tolerance_deg)
+                # Then check the replayed detection, projected with the pose the live system used, leads to the same pick
+                if not mismatch and payload['frame_id'] in replayed_detections:
+                    _, replayed_objects = replayed_detections[payload['frame_id']]
+                    reprojected = reproject(detector, replayed_objects, recorded_poses.get(payload['frame_id']))
+                    replayed_target = get_nearest_target(
+                        [get_target(position, marker_in_robot_frame_mm) for position in reprojected if position is not None], target)
+                    mismatch = compare_targets(target, replayed_target, position_tolerance_mm)
+                if mismatch:
+                    counts['angle_mismatches'] += 1
+                    print(f"[{seq}] {timestamp:.3f} Pick mismatch: {mismatch}")
+
+            elif record_type == RECORD_MESSAGE:
+                counts['messages'] += 1
+                print(f"[{seq}] {timestamp:.3f} Sent to {payload['channel']}: '{payload['message'].strip()}'")
+    finally:
+        recording.close()
+        if show:
+            cv2.destroyAllWindows()
+
+    print("\n--- Flight Replay Summary ---")
+    print(f"Frames replayed: {counts['frames']}")
+    print(f"Detections compared: {counts['detections']}, mismatches: {counts['detection_mismatches']}")
+    if lossless:
+        print(f"Marker pose drift (replayed frames give a different pose): {counts['pose_drifts']}")
+    else:
+        print("Marker pose drift: not checked, lossy frames do not reproduce the pose")
+    print(f"Picks compared: {counts['angles']}, mismatches: {counts['angle_mismatches']}")
+    print(f"Bluetooth messages: {counts['messages']}")
+    print("-------------------------------------------\n")
+
+if __name__ == "__main__":
+    main()
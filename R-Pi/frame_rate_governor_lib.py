@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_ACTIVE = "active"   # system started and the arm is ready for a new target
+STATE_MOTION = "motion"   # system started, arm is moving and we wait for "ready"
+STATE_IDLE = "idle"       # system stopped from the Android app
+
+# Maximum frames per second for each state, 0 means unlimited
+GOVERNOR_POLICIES = {
+    "performance": {STATE_ACTIVE: 0, STATE_MOTION: 0, STATE_IDLE: 0},
+    "balanced": {STATE_ACTIVE: 0, STATE_MOTION: 5, STATE_IDLE: 1},
+    "powersave": {STATE_ACTIVE: 10, STATE_MOTION: 2, STATE_IDLE: 0.5},
+}
+
+class FrameRateGovernor:
+    def __init__(self, policy="balanced"):
+        if isinstance(policy, str):
+            if policy not in GOVERNOR_POLICIES:
+                raise ValueError(f"Unknown governor policy '{policy}'. Available: {', '.join(GOVERNOR_POLICIES.keys())}")
+            self.policy_name = policy
+            self.policy = dict(GOVERNOR_POLICIES[policy])
+        else:
+            unknown_states = set(policy) - set(GOVERNOR_POLICIES["performance"])
+            if unknown_states:
+                raise ValueError(f"Unknown governor states {', '.join(sorted(unknown_states))}. Available: {STATE_ACTIVE}, {STATE_MOTION}, {STATE_IDLE}")
+            for state, fps in policy.items():
+                # Policies come from JSON configs, a string or null would only fail on the first throttled frame
+                if isinstance(fps, bool) or not isinstance(fps, (int, float)) or not fps >= 0:
+                    raise ValueError(f"Governor policy value for '{state}' must be a number >= 0 (0 means unlimited), got {fps!r}")
+            self.policy_name = "custom"
+            # States left out of a custom policy run unthrottled
+            self.policy = {state: policy.get(state, 0) for state in GOVERNOR_POLICIES["performance"]}
+
+        self.state = STATE_IDLE
+        self.wake_event = threading.Event()
+        self.last_frame_time = None
+        self.last_frame_cpu_time = None
+        self.avg_frame_cost_s = 0.0
+        self.avg_frame_cpu_s = 0.0 # CPU time of the calling (camera) thread per frame, waiting excluded
+
+        self.frames = {state: 0 for state in self.policy}
+        self.throttled_time_s = {state: 0.0 for state in self.policy}
+        self.frames_avoided = {state: 0.0 for state in self.policy}
+        self.cpu_time_saved_s = {state: 0.0 for state in self.policy}
+
+        logger.info("FrameRateGovernor initialized with '%s' policy: %s", self.policy_name,
+                    ", ".join(f"{state}={fps if fps else 'max'} fps" for state, fps in self.policy.items()))
+
+    def wake(self):
+        # Called from other threads (arm ready, app start) to cut the current wait short
+        self.wake_event.set()
+
+    def throttle(self, state):
+        now = time.monotonic()
+        cpu_now = time.thread_time()
+        if state != self.state:
+            logger.info("FrameRateGovernor: %s -> %s", self.state, state)
+            self.state = state
+
+        if self.last_frame_time is not None:
+            frame_cost = now - self.last_frame_time
+            self.avg_frame_cost_s = 0.9 * self.avg_frame_cost_s + 0.1 * frame_cost if self.avg_frame_cost_s else frame_cost
+            frame_cpu = cpu_now - self.last_frame_cpu_time
+            self.avg_frame_cpu_s = 0.9 * self.avg_frame_cpu_s + 0.1 * frame_cpu if self.avg_frame_cpu_s else frame_cpu
+        self.frames[state] += 1
+
+        max_fps = self.policy.get(state, 0)
+        if max_fps > 0:
+            remaining = 1.0 / max_fps - (now - self.last_frame_time if self.last_frame_time is not None else 0.0)
+            if remaining > 0:
+                self.wake_event.wait(remaining)
+                slept = time.monotonic() - now
+                self.throttled_time_s[state] += slept
+                if self.avg_frame_cost_s > 0:
+                    avoided = slept / self.avg_frame_cost_s
+                    self.frames_avoided[state] += avoided
+                    self.cpu_time_saved_s[state] += avoided * self.avg_frame_cpu_s
+        self.wake_event.clear()
+
+        self.last_frame_time = time.monotonic()
+        self.last_frame_cpu_time = time.thread_time()
+
+    def get_stats(self):
+        return {
+            'policy': self.policy_name,
+            'state': self.state,
+            'frames': dict(self.frames),
+            'throttled_time_s': dict(self.throttled_time_s),
+            'frames_avoided': {state: int(count) for state, count in self.frames_avoided.items()},
+            'cpu_time_saved_s': sum(self.cpu_time_saved_s.values())
+        }
+
+    def log_stats(self):
+        stats = self.get_stats()
+        # Only counts the thread that calls throttle(), detection running on a worker pool is not included
+        logger.info("FrameRateGovernor (%s): saved ~%.2f s of camera thread CPU time (%.1f ms per frame)",
+                    stats['policy'], stats['cpu_time_saved_s'], self.avg_frame_cpu_s * 1000)
+        for state in self.policy:
+            logger.info("  %s: %s frames, throttled %.1f s, ~%s frames avoided", state, stats['frames'][state], stats['throttled_time_s'][state], stats['frames_avoided'][state])
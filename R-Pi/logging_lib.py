@@ -0,0 +1,260 @@
+import atexit
+import logging
+import queue
+import struct
+import sys
+import threading
+import time
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# Binary log record: total length, timestamp, level, logger name length, then name and message (UTF-8)
+BINARY_RECORD_HEADER = struct.Struct("<IdBH")
+
+_writer = None
+_handler = None
+_writer_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    # Only records logged with extra={'rate_limit': True} are limited, e.g. per-frame warnings.
+    # Everything else, like the per-pick records, always goes through.
+    def __init__(self, interval_s=5.0, max_tracked=1000):
+        super().__init__()
+        self.interval_s = interval_s
+        self.max_tracked = max_tracked
+        self.lock = threading.Lock()
+        self.last_emit = {}
+        self.suppressed = {} # key -> (count, last suppressed record)
+
+    def _prune(self, now):
+        for key, last in list(self.last_emit.items()):
+            if now - last >= self.interval_s and key not in self.suppressed:
+                del self.last_emit[key]
+
+    def filter(self, record):
+        if not getattr(record, 'rate_limit', False):
+            return True
+        # Identical message and arguments count as a repeat, the same message with new values does not
+        key = (record.name, record.levelno, record.msg, record.args)
+        try:
+            hash(key)
+        except TypeError:
+            key = (record.name, record.levelno, record.getMessage())
+        with self.lock:
+            if len(self.last_emit) > self.max_tracked:
+                self._prune(record.created)
+            last = self.last_emit.get(key)
+            if last is not None and record.created - last < self.interval_s:
+                count, _ = self.suppressed.get(key, (0, None))
+                self.suppressed[key] = (count + 1, record)
+                return False
+            self.last_emit[key] = record.created
+            record.suppressed = self.suppressed.pop(key, (0, None))[0]
+        return True
+
+    def flush(self, now=None):
+        # Returns the last suppressed record of every message whose interval has expired (all of them
+        # when now is None), carrying the count of the others, so counts are not lost when messages stop
+        records = []
+        with self.lock:
+            for key, (count, record) in list(self.suppressed.items()):
+                if now is not None and now - self.last_emit[key] < self.interval_s:
+                    continue
+                del self.suppressed[key]
+                self.last_emit[key] = now if now is not None else record.created
+                summary = logging.LogRecord(record.name, record.levelno, record.pathname, record.lineno,
+                                            record.getMessage(), None, None)
+                summary.created = record.created
+                summary.msecs = record.msecs
+                summary.suppressed = count - 1
+                records.append(summary)
+        return records
+
+
+class AsyncLogHandler(logging.Handler):
+    def __init__(self, log_queue):
+        super().__init__()
+        self.queue = log_queue
+        self.dropped = 0
+
+    def emit(self, record):
+        # Message formatting is left to the writer thread, only tracebacks must be rendered here
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StreamSink:
+    def __init__(self, stream, formatter):
+        self.stream = stream
+        self.formatter = formatter
+
+    def write_batch(self, records):
+        self.stream.write("".join(self.formatter.format(record) + "\n" for record in records))
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class TextFileSink(StreamSink):
+    def __init__(self, path, formatter):
+        super().__init__(open(path, "a", encoding="utf-8"), formatter)
+
+    def close(self):
+        self.stream.close()
+
+
+class BinaryFileSink:
+    def __init__(self, path):
+        self.file = open(path, "ab")
+
+    def write_batch(self, records):
+        chunks = []
+        for record in records:
+            name = record.name.encode('utf-8')
+            message = format_message(record).encode('utf-8')
+            chunks.append(BINARY_RECORD_HEADER.pack(BINARY_RECORD_HEADER.size + len(name) + len(message),
+                                                    record.created, record.levelno, len(name)))
+            chunks.append(name)
+            chunks.append(message)
+        self.file.write(b"".join(chunks))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def format_message(record):
+    message = record.getMessage()
+    if getattr(record, 'suppressed', 0):
+        message += f" [{record.suppressed} similar messages suppressed]"
+    if record.exc_text:
+        message += "\n" + record.exc_text
+    return message
+
+
+class _SuppressedCountFormatter(logging.Formatter):
+    def format(self, record):
+        record.message = format_message(record)
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        return self.formatMessage(record)
+
+
+class AsyncLogWriter:
+    def __init__(self, sinks, queue_size=10000, batch_size=256, rate_limit_filter=None):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.rate_limit_filter = rate_limit_filter
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def _writer_loop(self):
+        running = True
+        while running:
+            # Block for one record, then drain whatever else is waiting and write it in one go.
+            # With rate limiting, wake up once per interval to write out expired suppressed counts.
+            try:
+                batch = [self.queue.get(timeout=self.rate_limit_filter.interval_s if self.rate_limit_filter else None)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            if self.rate_limit_filter:
+                batch.extend(self.rate_limit_filter.flush(time.time() if running else None))
+            if not batch:
+                continue
+            for sink in self.sinks:
+                try:
+                    sink.write_batch(batch)
+                except Exception as e:
+                    sys.stderr.write(f"ERROR: Log writer failed: {e}\n")
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        for sink in self.sinks:
+            sink.close()
+
+
+def setup_logging(level=logging.INFO, console=True, log_file=None, binary_log_file=None,
+                  rate_limit_interval_s=5.0, queue_size=10000):
+    global _writer, _handler
+    with _writer_lock:
+        if _writer:
+            return _writer
+
+        formatter = _SuppressedCountFormatter(LOG_FORMAT)
+        sinks = []
+        if console:
+            sinks.append(StreamSink(sys.stdout, formatter))
+        if log_file:
+            sinks.append(TextFileSink(log_file, formatter))
+        if binary_log_file:
+            sinks.append(BinaryFileSink(binary_log_file))
+
+        rate_limit_filter = RateLimitFilter(rate_limit_interval_s) if rate_limit_interval_s else None
+        _writer = AsyncLogWriter(sinks, queue_size=queue_size, rate_limit_filter=rate_limit_filter)
+        _writer.start()
+
+        _handler = AsyncLogHandler(_writer.queue)
+        if rate_limit_filter:
+            _handler.addFilter(rate_limit_filter)
+
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        root_logger.addHandler(_handler)
+
+        atexit.register(shutdown_logging)
+        return _writer
+
+def shutdown_logging():
+    global _writer, _handler
+    with _writer_lock:
+        if _writer:
+            logging.getLogger().removeHandler(_handler)
+            if _handler.dropped:
+                # Blocking put, the writer thread is still draining the queue
+                _writer.queue.put(logging.LogRecord("logging_lib", logging.WARNING, __file__, 0,
+                                                    "%s log records were dropped because the log queue was full",
+                                                    (_handler.dropped,), None))
+            _writer.stop()
+            _writer = None
+            _handler = None
+
+def read_binary_log(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + BINARY_RECORD_HEADER.size <= len(data):
+        length, created, levelno, name_len = BINARY_RECORD_HEADER.unpack_from(data, offset)
+        start = offset + BINARY_RECORD_HEADER.size
+        name = data[start:start + name_len].decode('utf-8')
+        message = data[start + name_len:offset + length].decode('utf-8')
+        yield created, levelno, name, message
+        offset += length
+
+if __name__ == "__main__":
+    # python logging_lib.py <binary log> prints a binary log as text
+    for created, levelno, name, message in read_binary_log(sys.argv[1]):
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created)) + f",{int(created * 1000) % 1000:03d}"
+        print(f"{timestamp} {logging.getLevelName(levelno):<7} {name}: {message}")
@@ -1,31 +1,57 @@
-import cv2
 import cv2.aruco as aruco
 from aruco_detector_lib import ObjectDetector
 from braccio_robot_lib import BraccioKinematicsSolver
 from braccio_bluetooth_lib import BraccioBluetoothSender
 from android_bluetooth_lib import AndroidBluetoothServer
+from motion_gate_lib import MotionGate
+from frame_rate_governor_lib import FrameRateGovernor
+from flight_recorder_lib import FlightRecorder
+from sort_cell_lib import SortCell, PiCameraSource
+from logging_lib import setup_logging
 import numpy as np
+import logging
 import time
-import threading
 
-# For Pi Camera
-from picamera2 import Picamera2, Preview
-# --- Initialize Picamera2 ---
-picam2 = Picamera2()
-camera_config = picam2.create_still_configuration(main={"size": (1280, 720), "format": "BGR888"})
-picam2.configure(camera_config)
-picam2.start()
+# --- Logging ---
+LOG_LEVEL = logging.INFO
+LOG_FILE = None           # e.g. 'color_sorter.log'
+BINARY_LOG_FILE = None    # e.g. 'color_sorter.binlog', print it with: python logging_lib.py <file>
+LOG_RATE_LIMIT_S = 5.0    # per-frame warnings marked rate_limit are logged at most once per interval
+
+setup_logging(level=LOG_LEVEL, log_file=LOG_FILE, binary_log_file=BINARY_LOG_FILE, rate_limit_interval_s=LOG_RATE_LIMIT_S)
+logger = logging.getLogger("main")
+
+# --- Initialize Pi Camera ---
+camera = PiCameraSource(index=0, size=(1280, 720))
 
 # --- Configuration for ObjectDetector ---
 CALIBRATION_FILE = 'camera_calibration.npz'
 ARUCO_DICT_TYPE = aruco.DICT_6X6_250
 MARKER_LENGTH_MM = 50.0
 MIN_OBJECT_AREA_PIXELS = 1000
-
-ready_event = threading.Event()
-
-data = 0
-detected_colour = 0
+SHOW_DISPLAY = True # set to False when running headless (e.g. under cell_simulator.py)
+
+# --- Configuration for MotionGate ---
+MOTION_GATE_SIZE = (160, 90)               # downsampled frame used for differencing
+MOTION_PIXEL_DIFF_THRESHOLD = 25           # level change in any channel that counts a pixel as changed
+MOTION_CHANGED_FRACTION_THRESHOLD = 0.0005 # fraction of changed pixels that counts as motion, below one block
+MOTION_MAX_SKIP_FRAMES = 30                # force a full detection after this many skipped frames
+MOTION_STATS_INTERVAL_FRAMES = 300         # how often the skip rate is logged
+
+# --- Configuration for FrameRateGovernor ---
+GOVERNOR_POLICY = "balanced"              # "performance", "balanced", "powersave" or a {state: fps} dict
+
+# --- Configuration for FlightRecorder ---
+FLIGHT_RECORDER_FILE = 'flight_recorder.bin'
+FLIGHT_RECORDER_SIZE_MB = 64
+FLIGHT_RECORDER_FRAME_SCALE = 0.5         # frames are downscaled before compression
+FLIGHT_RECORDER_FRAME_FORMAT = "jpeg"     # "png" with scale 1.0 stores frames losslessly so replay reproduces the marker pose exactly
+FLIGHT_RECORDER_JPEG_QUALITY = 70
+FLIGHT_RECORDER_MIN_FRAME_INTERVAL_S = 0.0 # 0 records every frame that went through detection
+
+# --- Configuration for PipelinedPickController ---
+PICK_EXCLUSION_RADIUS_MM = 30.0           # detections this close to the block being picked are ignored while the arm moves
+PICK_REPLAN_TOLERANCE_MM = 2.0            # the prepared joint angles are kept while the target moves less than this
 
 COLOR_RANGES = {
     "Red Block": {
@@ -51,9 +77,9 @@ MARKER_X_IN_ROBOT_FRAME_MM = 120.0   # marker is 120mm forward of robot base
 MARKER_Y_IN_ROBOT_FRAME_MM = -70.0   # marker is 70mm to the robot's right of robot base
 MARKER_Z_IN_ROBOT_FRAME_MM = 0.0     # marker is on the same plane as robot's Z=0 (table)
 
-print(f"\n--- Robot to ArUco Alignment ---")
-print(f"Assuming ArUco marker center is at (X={MARKER_X_IN_ROBOT_FRAME_MM:.1f}, Y={MARKER_Y_IN_ROBOT_FRAME_MM:.1f}, Z={MARKER_Z_IN_ROBOT_FRAME_MM:.1f}) mm in the robot's base frame.")
-print("-------------------------------------------\n")
+logger.info("--- Robot to ArUco Alignment ---")
+logger.info("Assuming ArUco marker center is at (X=%.1f, Y=%.1f, Z=%.1f) mm in the robot's base frame.", MARKER_X_IN_ROBOT_FRAME_MM, MARKER_Y_IN_ROBOT_FRAME_MM, MARKER_Z_IN_ROBOT_FRAME_MM)
+logger.info("-------------------------------------------")
 
 # --- Bluetooth Configuration ---
 HC05_MAC_ADDRESS = "98:DA:50:03:A4:B5"
@@ -62,14 +88,6 @@ BLUETOOTH_PORT = 1
 PHONE_MAC = "1C:F8:D0:B6:07:BC"
 PORT = 2 
 
-was_data_sent = False
-
-system_start_lock = threading.Lock()
-system_start = 0 
-
-connected_client_socket = None
-connection_ready_event = threading.Event()
-
 # --- Initialize ObjectDetector ---
 try:
     detector = ObjectDetector(
@@ -80,9 +98,39 @@ try:
         min_object_area_pixels=MIN_OBJECT_AREA_PIXELS
     )
 except Exception as e:
-    print(f"Application could not start due to detector initialization error: {e}")
+    logger.error("Application could not start due to detector initialization error: %s", e)
     exit()
 
+# --- Initialize MotionGate ---
+motion_gate = MotionGate(
+    downsample_size=MOTION_GATE_SIZE,
+    pixel_diff_threshold=MOTION_PIXEL_DIFF_THRESHOLD,
+    changed_fraction_threshold=MOTION_CHANGED_FRACTION_THRESHOLD,
+    max_skip_frames=MOTION_MAX_SKIP_FRAMES
+)
+
+# --- Initialize FrameRateGovernor ---
+governor = FrameRateGovernor(policy=GOVERNOR_POLICY)
+
+# --- Initialize FlightRecorder ---
+# The metadata lets flight_replay.py rebuild the same detector without importing main.py
+recorder = FlightRecorder(
+    path=FLIGHT_RECORDER_FILE,
+    capacity_bytes=FLIGHT_RECORDER_SIZE_MB * 1024 * 1024,
+    frame_scale=FLIGHT_RECORDER_FRAME_SCALE,
+    jpeg_quality=FLIGHT_RECORDER_JPEG_QUALITY,
+    frame_format=FLIGHT_RECORDER_FRAME_FORMAT,
+    min_frame_interval_s=FLIGHT_RECORDER_MIN_FRAME_INTERVAL_S,
+    metadata={
+        'calibration_file': CALIBRATION_FILE,
+        'aruco_dict_type': ARUCO_DICT_TYPE,
+        'marker_length_mm': MARKER_LENGTH_MM,
+        'color_ranges': COLOR_RANGES,
+        'min_object_area_pixels': MIN_OBJECT_AREA_PIXELS,
+        'marker_in_robot_frame_mm': [MARKER_X_IN_ROBOT_FRAME_MM, MARKER_Y_IN_ROBOT_FRAME_MM, MARKER_Z_IN_ROBOT_FRAME_MM]
+    }
+)
+
 # --- Initialize Braccio Kinematics Solver ---
 braccio_solver = BraccioKinematicsSolver()
 
@@ -98,173 +146,35 @@ server = AndroidBluetoothServer(
     expected_mac_address=PHONE_MAC
 )
 
-# --- Braccio Robot Control Function ---
-def move_braccio_to_coordinates(x_target_robot_frame_mm, y_target_robot_frame_mm, z_target_robot_frame_mm, detected_class=1):
-    print(f"\n--- BRACCIO ROBOT CONTROL ---")
-    print(f"Attempting to reach target (Robot Frame): X={x_target_robot_frame_mm:.0f}mm, Y={y_target_robot_frame_mm:.0f}mm, Z={z_target_robot_frame_mm:.0f}mm")
-
-    joint_angles = braccio_solver.calculate_joint_angles(x_target_robot_frame_mm, y_target_robot_frame_mm, z_target_robot_frame_mm)
-    if(joint_angles == None):
-        return 1, 1
-
-    if joint_angles:
-        print("Calculated Joint Angles (Degrees):")
-        for joint, angle in joint_angles.items():
-            print(f"  {joint.replace('_', ' ').title()}: {angle:.1f} degrees")
-        
-        # --- SEND ANGLES OVER BLUETOOTH ---
-        if bt_sender.sock:
-            bt_sender.send_angles(
-                base_angle=joint_angles['base'],
-                shoulder_angle=joint_angles['shoulder'],
-                elbow_angle=joint_angles['elbow'],
-                obj_class=detected_class
-            )
-            print("Data sent")
-        else:
-            print("Bluetooth not connected. Angles not sent.")
-        
-    else:
-        print("Target is unreachable or angles could not be calculated. No angles sent via Bluetooth.")
-    print("-------------------------------------------\n")
-    return 0, 0
-
-def get_coords(obj):
-    obj_y_from_marker = obj['rel_3d_from_aruco_mm'][1]
-    obj_x_from_marker = obj['rel_3d_from_aruco_mm'][0]
-    obj_z_from_marker = obj['rel_3d_from_aruco_mm'][2]
-                    
-    # Convert object coordinates relative to marker to robot base frame
-    target_x_robot = MARKER_X_IN_ROBOT_FRAME_MM + obj_x_from_marker
-    target_y_robot = MARKER_Y_IN_ROBOT_FRAME_MM + obj_y_from_marker
-    target_z_robot = MARKER_Z_IN_ROBOT_FRAME_MM + obj_z_from_marker
-                    
-    return (target_x_robot, target_y_robot, target_z_robot)
-
-def camera():
-    global data
-    global was_data_sent
-    global detected_colour
-
-    try:
-        while True:
-            # Capture frame 
-            frame = picam2.capture_array("main")
-            
-            if frame is None:
-                print("Failed to grab frame. Exiting...")
-                break
-
-            # Process the frame using the ObjectDetector
-            display_frame, aruco_data, detected_objects = detector.process_frame(frame)
-
-            # --- Display the processed frame ---
-            cv2.imshow("Real-Time Object Detection for Braccio Control", display_frame)
-
-            detected_block = [0,0,0]
-            detected_colour = 0                                                           
-            if(len(detected_objects) != 0):
-                if detected_objects[0]['color_name'] == "Red Block" and detected_objects[0]['rel_3d_from_aruco_mm'] is not None:
-                    detected_block = get_coords(detected_objects[0])
-                    detected_colour = 0
-                elif detected_objects[0]['color_name'] == "Pink Block" and detected_objects[0]['rel_3d_from_aruco_mm'] is not None:
-                    detected_block = get_coords(detected_objects[0])
-                    detected_colour = 1
-                elif detected_objects[0]['color_name'] == "Blue Block" and detected_objects[0]['rel_3d_from_aruco_mm'] is not None:
-                    detected_block = get_coords(detected_objects[0])
-                    detected_colour = 2
-                elif detected_objects[0]['color_name'] == "Yellow Block" and detected_objects[0]['rel_3d_from_aruco_mm'] is not None:
-                    detected_block = get_coords(detected_objects[0])
-                    detected_colour = 3
-
-            if(system_start):    
-                if(data):
-                    was_data_sent, data = move_braccio_to_coordinates(
-                        x_target_robot_frame_mm=detected_block[0],
-                        y_target_robot_frame_mm=detected_block[1],
-                        z_target_robot_frame_mm=detected_block[2],
-                        detected_class = detected_colour
-                    )
-                
-                if not was_data_sent:
-                    if client_sock:
-                        msg = str(detected_colour) + "\n"
-                        server.send_data(client_sock, msg)
-                        print(f"Sent {msg} to android app!")
-                        was_data_sent = True
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break   
-
-        
-
-    except Exception as e:
-        print(f"An error occurred during script execution: {e}")
-    finally:
-        # --- Cleanup ---
-        picam2.stop()
-        cv2.destroyAllWindows()
-        if bt_connected:
-            bt_sender.disconnect()
-        print("Main application loop finished.")
-
-def ready():
-    global data
-    while True:
-        data = bt_sender.receive_ready()
-        if(data):
-            print("Received ready!")
-
-def android_receive():
-    global system_start
-    global client_sock
-    if client_sock:
-        print("\nReady to receive data from the Android app. Press Ctrl+C to stop receiving.")
-        try:
-            while True:
-                received_data = server.receive_data(client_sock)
-                if received_data:
-                    try:
-                        received_int_data = int(received_data)
-                        with system_start_lock:
-                            system_start = received_int_data
-                        print(f"System start flag updated to: {system_start}")
-                    except ValueError:
-                        print(f"Warning: Received non-integer data for system_start: '{received_data}'")
-                time.sleep(0.1)
-        except KeyboardInterrupt:
-            print("\nReceiver communication interrupted by user.")
-        except Exception as e:
-            print(f"Error during receiving: {e}")
-        finally:
-            print("Receive loop finished.")
-    else:
-        print("ERROR: Client socket not available for receiving.")
+# --- Initialize SortCell ---
+# The same control loop cell_orchestrator.py runs for every station
+cell = SortCell(
+    name="main",
+    camera=camera,
+    detector=detector,
+    braccio_solver=braccio_solver,
+    bt_sender=bt_sender,
+    marker_in_robot_frame_mm=(MARKER_X_IN_ROBOT_FRAME_MM, MARKER_Y_IN_ROBOT_FRAME_MM, MARKER_Z_IN_ROBOT_FRAME_MM),
+    motion_gate=motion_gate,
+    governor=governor,
+    android_server=server,
+    recorder=recorder,
+    exclusion_radius_mm=PICK_EXCLUSION_RADIUS_MM,
+    replan_tolerance_mm=PICK_REPLAN_TOLERANCE_MM,
+    show_display=SHOW_DISPLAY,
+    stats_interval_frames=MOTION_STATS_INTERVAL_FRAMES
+)
 
-if __name__ == "__main__":    
+def main():
     time.sleep(2) # Delay for picam
 
-    print("\n--- Starting Main Application Loop ---")
-    
-    bt_connected = bt_sender.connect()
-    if not bt_connected:
-        print("WARNING: Bluetooth connection failed. Robot control commands will not be sent.")
-
-    if server.start_server():
-        client_sock, client_addr = server.accept_connection()
-        if not client_sock:
-            print("WARNING: Bluetooth connection to android app failed. Colour data will not be sent.")
-        else:
-            print(f"Connection established and ready for communication.")
-
+    logger.info("--- Starting Main Application Loop ---")
 
-    t1 = threading.Thread(target=camera)
-    t2 = threading.Thread(target=ready, daemon=True) 
-    t3 = threading.Thread(target=android_receive, daemon=True)
+    # Detection runs on the camera thread, the arm ready signal and the app on their own threads
+    cell.start()
+    cell.join()
 
-    t1.start()
-    t2.start()
-    t3.start()
+    logger.info("Main application loop finished.")
 
-    t1.join()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
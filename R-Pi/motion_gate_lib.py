@@ -0,0 +1,77 @@
+import cv2
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class MotionGate:
+    def __init__(self, downsample_size=(160, 90), pixel_diff_threshold=25, changed_fraction_threshold=0.0005, max_skip_frames=30):
+        self.downsample_size = downsample_size
+        self.pixel_diff_threshold = pixel_diff_threshold
+        self.changed_fraction_threshold = changed_fraction_threshold
+        self.max_skip_frames = max_skip_frames
+
+        self.reference_frame = None
+        self.consecutive_skips = 0
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+        logger.info("MotionGate initialized: size=%s, pixel threshold=%s, changed fraction=%s, max skip=%s",
+                    self.downsample_size, self.pixel_diff_threshold, self.changed_fraction_threshold, self.max_skip_frames)
+
+    def _downsample(self, frame):
+        # Colour is kept, a block can have the same brightness as the table
+        small_frame = cv2.resize(frame, self.downsample_size, interpolation=cv2.INTER_AREA)
+        # Blur to suppress sensor noise so it is not counted as motion
+        return cv2.GaussianBlur(small_frame, (3, 3), 0)
+
+    def should_process(self, frame):
+        self.frames_total += 1
+        small_frame = self._downsample(frame)
+        # Read once, reset() may clear it from another thread
+        reference_frame = self.reference_frame
+
+        if reference_frame is None:
+            self.reference_frame = small_frame
+            self.consecutive_skips = 0
+            return True
+
+        # Force a full detection now and then so a slow drift is never missed
+        if self.consecutive_skips >= self.max_skip_frames:
+            self.reference_frame = small_frame
+            self.consecutive_skips = 0
+            return True
+
+        diff = cv2.absdiff(small_frame, reference_frame)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+        changed_fraction = np.count_nonzero(diff > self.pixel_diff_threshold) / diff.size
+
+        if changed_fraction > self.changed_fraction_threshold:
+            self.reference_frame = small_frame
+            self.consecutive_skips = 0
+            return True
+
+        self.consecutive_skips += 1
+        self.frames_skipped += 1
+        return False
+
+    def reset(self):
+        # Called when the system is started or stopped, the next frame is always processed
+        self.reference_frame = None
+        self.consecutive_skips = 0
+
+    def get_skip_rate(self):
+        if self.frames_total == 0:
+            return 0.0
+        return self.frames_skipped / self.frames_total
+
+    def get_stats(self):
+        return {
+            'frames_total': self.frames_total,
+            'frames_skipped': self.frames_skipped,
+            'skip_rate': self.get_skip_rate()
+        }
+
+    def log_stats(self):
+        logger.info("MotionGate: skipped %s/%s frames (%.1f%%)", self.frames_skipped, self.frames_total, self.get_skip_rate() * 100)
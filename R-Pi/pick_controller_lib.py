@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class PipelinedPickController:
+    def __init__(self, braccio_solver, send_pick, exclusion_radius_mm=30.0, replan_tolerance_mm=2.0,
+                 retry_interval_s=1.0, max_retry_interval_s=30.0):
+        self.braccio_solver = braccio_solver
+        self.send_pick = send_pick # callable(plan) -> bool, performs the actual Bluetooth sends
+        self.exclusion_radius_mm = exclusion_radius_mm
+        self.replan_tolerance_mm = replan_tolerance_mm
+        self.retry_interval_s = retry_interval_s
+        self.max_retry_interval_s = max_retry_interval_s
+
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.arm_ready = False
+        self.ready_time = None
+        self.in_flight = None
+        self.next_plan = None
+        self.unreachable = [] # targets the solver already rejected, not solved again
+        self.send_failures = 0
+        self.retry_time = 0.0
+
+        self.picks_sent = 0
+        self.picks_sent_on_ready = 0
+        self.plans_computed = 0
+        self.plans_reused = 0
+        self.ready_to_send_s = []
+
+        logger.info("PipelinedPickController initialized: exclusion radius=%.0f mm, replan tolerance=%.0f mm",
+                    self.exclusion_radius_mm, self.replan_tolerance_mm)
+
+    def _distance(self, target_a, target_b):
+        return np.hypot(target_a[0] - target_b[0], target_a[1] - target_b[1])
+
+    def _plan(self, candidates, frame_id):
+        # While the arm is moving, the block it is picking may still be visible, skip it
+        excluded = self.in_flight['target'] if self.in_flight and not self.arm_ready else None
+        # Forget unreachable targets that are no longer on the table
+        self.unreachable = [u for u in self.unreachable
+                            if any(self._distance(u, target) < self.replan_tolerance_mm for target, _ in candidates)]
+
+        for target, obj_class in candidates:
+            if excluded is not None and self._distance(target, excluded) < self.exclusion_radius_mm:
+                continue
+            if any(self._distance(target, u) < self.replan_tolerance_mm for u in self.unreachable):
+                continue
+
+            previous = self.next_plan
+            if previous and previous['obj_class'] == obj_class and self._distance(target, previous['target']) < self.replan_tolerance_mm:
+                self.plans_reused += 1
+                return previous
+
+            joint_angles = self.braccio_solver.calculate_joint_angles(*target)
+            self.plans_computed += 1
+            if joint_angles is None:
+                self.unreachable.append(target)
+                continue # unreachable, try the next block
+
+            return {
+                'target': target,
+                'obj_class': obj_class,
+                'joint_angles': joint_angles,
+                'frame_id': frame_id
+            }
+        return None
+
+    def _dispatch(self):
+        now = time.monotonic()
+        if now < self.retry_time:
+            return False
+        plan = self.next_plan
+        if not self.send_pick(plan):
+            # Keep the plan but back off, so a dropped connection is not retried on every frame
+            self.send_failures += 1
+            retry_in = min(self.retry_interval_s * 2 ** (self.send_failures - 1), self.max_retry_interval_s)
+            self.retry_time = now + retry_in
+            logger.warning("PipelinedPickController: sending the pick failed, retrying in %.1f s", retry_in)
+            return False
+        self.send_failures = 0
+        self.retry_time = 0.0
+        self.next_plan = None
+        if self.ready_time is not None:
+            self.ready_to_send_s.append(time.monotonic() - self.ready_time)
+        self.arm_ready = False
+        self.in_flight = plan
+        self.picks_sent += 1
+        return True
+
+    def update(self, candidates, frame_id=None):
+        # candidates: [(target_xyz_mm, obj_class), ...] in priority order from the latest detection
+        with self.lock:
+            self.next_plan = self._plan(candidates, frame_id)
+            if self.enabled and self.arm_ready and self.next_plan:
+                self._dispatch()
+
+    def on_ready(self):
+        with self.lock:
+            self.arm_ready = True
+            self.ready_time = time.monotonic()
+            if self.enabled and self.next_plan and self._dispatch():
+                self.picks_sent_on_ready += 1
+
+    def set_enabled(self, enabled):
+        with self.lock:
+            self.enabled = enabled
+            if enabled and self.arm_ready:
+                # Idle time before start is not pick latency
+                self.ready_time = time.monotonic()
+                if self.next_plan:
+                    self._dispatch()
+
+    def is_arm_ready(self):
+        return self.arm_ready
+
+    def log_stats(self):
+        logger.info("PipelinedPickController: %s picks sent, %s sent straight on ready, %s IK solves, %s plans reused",
+                    self.picks_sent, self.picks_sent_on_ready, self.plans_computed, self.plans_reused)
+        if self.ready_to_send_s:
+            logger.info("PipelinedPickController: ready -> send mean %.0f ms", np.mean(self.ready_to_send_s) * 1000)
@@ -0,0 +1,433 @@
+import cv2
+import cv2.aruco as aruco
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from aruco_detector_lib import ObjectDetector
+from braccio_robot_lib import BraccioKinematicsSolver
+from braccio_bluetooth_lib import BraccioBluetoothSender
+from android_bluetooth_lib import AndroidBluetoothServer
+from motion_gate_lib import MotionGate
+from frame_rate_governor_lib import FrameRateGovernor, STATE_ACTIVE, STATE_MOTION, STATE_IDLE
+from flight_recorder_lib import FlightRecorder
+from pick_controller_lib import PipelinedPickController
+
+logger = logging.getLogger(__name__)
+
+# Class sent to the arm and the Android app for each colour
+COLOR_CLASSES = {
+    "Red Block": 0,
+    "Pink Block": 1,
+    "Blue Block": 2,
+    "Yellow Block": 3
+}
+
+# Detection order when the pool is busy: a cell whose arm is waiting goes first
+STATE_PRIORITY = {STATE_ACTIVE: 0, STATE_MOTION: 1, STATE_IDLE: 2}
+
+
+class PiCameraSource:
+    def __init__(self, index=0, size=(1280, 720)):
+        from picamera2 import Picamera2
+        self.picam2 = Picamera2(index)
+        camera_config = self.picam2.create_still_configuration(main={"size": tuple(size), "format": "BGR888"})
+        self.picam2.configure(camera_config)
+        self.picam2.start()
+
+    def capture(self):
+        return self.picam2.capture_array("main")
+
+    def stop(self):
+        self.picam2.stop()
+
+
+class OpenCVCameraSource:
+    # USB cameras, video files and network streams
+    def __init__(self, device=0, size=None):
+        self.capture_device = cv2.VideoCapture(device)
+        if not self.capture_device.isOpened():
+            raise RuntimeError(f"Could not open camera '{device}'")
+        if size:
+            self.capture_device.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.capture_device.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+
+    def capture(self):
+        ok, frame = self.capture_device.read()
+        return frame if ok else None
+
+    def stop(self):
+        self.capture_device.release()
+
+CAMERA_SOURCES = {
+    "picamera2": PiCameraSource,
+    "opencv": OpenCVCameraSource,
+}
+
+def open_camera(camera_config):
+    camera_config = dict(camera_config)
+    camera_type = camera_config.pop("type", "picamera2")
+    if camera_type not in CAMERA_SOURCES:
+        raise ValueError(f"Unknown camera type '{camera_type}'. Available: {', '.join(CAMERA_SOURCES.keys())}")
+    return CAMERA_SOURCES[camera_type](**camera_config)
+
+
+class DetectionPool:
+    # Worker threads shared by all cells. cv2 releases the GIL in the heavy calls, so threads
+    # scale across cores without copying frames between processes.
+    def __init__(self, num_workers=2):
+        self.num_workers = num_workers
+        self.condition = threading.Condition()
+        self.jobs = []
+        self.seq = 0
+        self.running = False
+        self.threads = []
+
+        self.jobs_done = {}
+        self.queue_wait_s = {}
+        self.detect_time_s = {}
+
+        logger.info("DetectionPool initialized with %s workers", self.num_workers)
+
+    def start(self):
+        self.running = True
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"detection-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, cell_name, detector, frame, state):
+        future = Future()
+        with self.condition:
+            # Higher priority state first, then first come first served across cells
+            heapq.heappush(self.jobs, (STATE_PRIORITY.get(state, len(STATE_PRIORITY)), self.seq, cell_name, detector, frame, time.monotonic(), future))
+            self.seq += 1
+            self.condition.notify()
+        return future
+
+    def _worker_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.jobs:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                _, _, cell_name, detector, frame, submit_time, future = heapq.heappop(self.jobs)
+
+            start = time.monotonic()
+            try:
+                future.set_result(detector.process_frame(frame))
+            except Exception as e:
+                future.set_exception(e)
+            end = time.monotonic()
+
+            with self.condition:
+                self.jobs_done[cell_name] = self.jobs_done.get(cell_name, 0) + 1
+                self.queue_wait_s[cell_name] = self.queue_wait_s.get(cell_name, 0.0) + start - submit_time
+                self.detect_time_s[cell_name] = self.detect_time_s.get(cell_name, 0.0) + end - start
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            for job in self.jobs:
+                job[-1].cancel()
+            self.jobs = []
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def log_stats(self):
+        for cell_name, count in self.jobs_done.items():
+            logger.info("DetectionPool: %s: %s frames, mean queue wait %.0f ms, mean detection %.0f ms", cell_name, count,
+                        self.queue_wait_s[cell_name] / count * 1000, self.detect_time_s[cell_name] / count * 1000)
+
+
+class SortCell:
+    # One camera + Braccio station. main.py builds a single cell from its constants,
+    # cell_orchestrator.py builds several from a config file and runs them in one process.
+    def __init__(self, name, camera, detector, braccio_solver, bt_sender, marker_in_robot_frame_mm,
+                 motion_gate, governor, android_server=None, recorder=None,
+                 exclusion_radius_mm=30.0, replan_tolerance_mm=2.0,
+                 show_display=False, stats_interval_frames=300):
+        self.name = name
+        self.camera = camera
+        self.detector = detector
+        self.braccio_solver = braccio_solver
+        self.bt_sender = bt_sender
+        self.marker_in_robot_frame_mm = marker_in_robot_frame_mm
+        self.motion_gate = motion_gate
+        self.governor = governor
+        self.android_server = android_server
+        self.recorder = recorder
+        self.show_display = show_display
+        self.stats_interval_frames = stats_interval_frames # 0 only logs the motion gate stats when the cell stops
+        self.logger = logging.getLogger(f"{__name__}.{name}")
+
+        self.pick_controller = PipelinedPickController(
+            braccio_solver=braccio_solver,
+            send_pick=self.send_pick,
+            exclusion_radius_mm=exclusion_radius_mm,
+            replan_tolerance_mm=replan_tolerance_mm
+        )
+
+        self.system_start = 0
+        self.client_sock = None
+        self.bt_connected = False
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    @classmethod
+    def from_config(cls, config):
+        color_ranges = {
+            color_name: {
+                "lower": np.array(bounds["lower"]),
+                "upper": np.array(bounds["upper"])
+            }
+            for color_name, bounds in config['color_ranges'].items()
+        }
+        # A dictionary name like "DICT_6X6_250", or the cv2.aruco constant itself
+        aruco_dict_type = config.get('aruco_dict', 'DICT_6X6_250')
+        if isinstance(aruco_dict_type, str):
+            aruco_dict_type = getattr(aruco, aruco_dict_type)
+        marker_in_robot_frame_mm = tuple(config['marker_in_robot_frame_mm'])
+
+        detector = ObjectDetector(
+            calibration_file=config['calibration_file'],
+            aruco_dict_type=aruco_dict_type,
+            marker_length_mm=config.get('marker_length_mm', 50.0),
+            color_ranges=color_ranges,
+            min_object_area_pixels=config.get('min_object_area_pixels', 1000)
+        )
+
+        motion_config = config.get('motion_gate', {})
+        motion_gate = MotionGate(
+            downsample_size=tuple(motion_config.get('size', (160, 90))),
+            pixel_diff_threshold=motion_config.get('pixel_diff_threshold', 25),
+            changed_fraction_threshold=motion_config.get('changed_fraction_threshold', 0.0005),
+            max_skip_frames=motion_config.get('max_skip_frames', 30)
+        )
+
+        bt_config = config['braccio']
+        bt_sender = BraccioBluetoothSender(mac_address=bt_config['mac_address'], port=bt_config.get('port', 1))
+
+        android_server = None
+        if config.get('android'):
+            android_server = AndroidBluetoothServer(
+                port=config['android']['port'],
+                expected_mac_address=config['android'].get('phone_mac')
+            )
+
+        recorder = None
+        if config.get('flight_recorder_file'):
+            recorder = FlightRecorder(
+                path=config['flight_recorder_file'],
+                capacity_bytes=config.get('flight_recorder_size_mb', 64) * 1024 * 1024,
+                frame_scale=config.get('flight_recorder_frame_scale', 0.5),
+                frame_format=config.get('flight_recorder_frame_format', 'jpeg'),
+                jpeg_quality=config.get('flight_recorder_jpeg_quality', 70),
+                min_frame_interval_s=config.get('flight_recorder_min_frame_interval_s', 0.0),
+                metadata={
+                    'calibration_file': config['calibration_file'],
+                    'aruco_dict_type': aruco_dict_type,
+                    'marker_length_mm': config.get('marker_length_mm', 50.0),
+                    'color_ranges': color_ranges,
+                    'min_object_area_pixels': config.get('min_object_area_pixels', 1000),
+                    'marker_in_robot_frame_mm': list(marker_in_robot_frame_mm)
+                }
+            )
+
+        cell = cls(
+            name=config['name'],
+            camera=open_camera(config.get('camera', {})),
+            detector=detector,
+            braccio_solver=BraccioKinematicsSolver(),
+            bt_sender=bt_sender,
+            marker_in_robot_frame_mm=marker_in_robot_frame_mm,
+            motion_gate=motion_gate,
+            governor=FrameRateGovernor(policy=config.get('governor_policy', 'balanced')),
+            android_server=android_server,
+            recorder=recorder,
+            exclusion_radius_mm=config.get('pick_exclusion_radius_mm', 30.0),
+            replan_tolerance_mm=config.get('pick_replan_tolerance_mm', 2.0),
+            show_display=config.get('show_display', False),
+            stats_interval_frames=config.get('stats_interval_frames', 300)
+        )
+        # A cell without an app never moves unless the config explicitly asks for it
+        if not android_server and config.get('auto_start', False):
+            cell.set_system_start(1)
+        return cell
+
+    def get_coords(self, obj):
+        return tuple(self.marker_in_robot_frame_mm[i] + obj['rel_3d_from_aruco_mm'][i] for i in range(3))
+
+    def get_system_state(self):
+        if not self.system_start:
+            return STATE_IDLE
+        if not self.pick_controller.is_arm_ready():
+            return STATE_MOTION # waiting for the arm to report ready
+        return STATE_ACTIVE
+
+    def set_system_start(self, value):
+        self.system_start = value
+        # Never pick from a reference frame captured while the system was stopped
+        self.motion_gate.reset()
+        self.pick_controller.set_enabled(bool(value))
+        self.governor.wake()
+
+    def send_pick(self, plan):
+        target = plan['target']
+        joint_angles = plan['joint_angles']
+        detected_class = plan['obj_class']
+
+        self.logger.info("--- BRACCIO ROBOT CONTROL ---")
+        self.logger.info("Attempting to reach target (Robot Frame): X=%.0fmm, Y=%.0fmm, Z=%.0fmm", target[0], target[1], target[2])
+        if self.recorder:
+            self.recorder.record_angles(plan['frame_id'], target, detected_class, joint_angles)
+
+        self.logger.info("Calculated Joint Angles (Degrees):")
+        for joint, angle in joint_angles.items():
+            self.logger.info("  %s: %.1f degrees", joint.replace('_', ' ').title(), angle)
+
+        # --- SEND ANGLES OVER BLUETOOTH ---
+        if not self.bt_sender.sock:
+            self.logger.warning("Bluetooth not connected. Angles not sent.")
+            return False
+        if not self.bt_sender.send_angles(
+            base_angle=joint_angles['base'],
+            shoulder_angle=joint_angles['shoulder'],
+            elbow_angle=joint_angles['elbow'],
+            obj_class=detected_class
+        ):
+            return False
+        if self.recorder:
+            self.recorder.record_message("braccio", self.bt_sender.last_message)
+        self.logger.info("Data sent")
+        self.logger.info("-------------------------------------------")
+
+        if self.client_sock:
+            msg = str(detected_class) + "\n"
+            if self.android_server.send_data(self.client_sock, msg) and self.recorder:
+                self.recorder.record_message("android", msg)
+            self.logger.info("Sent %s to android app!", msg.strip())
+        return True
+
+    def start(self, pool=None):
+        # Without a pool, detection runs on the cell's own camera thread
+        if self.recorder and not self.recorder.start():
+            self.logger.warning("Flight recorder failed to start. Frames and decisions will not be recorded.")
+
+        self.bt_connected = self.bt_sender.connect()
+        if not self.bt_connected:
+            self.logger.warning("Bluetooth connection failed. Robot control commands will not be sent.")
+
+        self.threads = [threading.Thread(target=self.camera_loop, args=(pool,), name=f"{self.name}-camera")]
+        if self.bt_connected:
+            self.threads.append(threading.Thread(target=self.ready_loop, name=f"{self.name}-ready", daemon=True))
+        if self.android_server:
+            self.threads.append(threading.Thread(target=self.android_loop, name=f"{self.name}-android", daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def join(self):
+        self.threads[0].join()
+
+    def stop(self):
+        # Ends the camera loop after the current frame, safe to call from any thread
+        self.stop_event.set()
+        self.governor.wake()
+
+    def camera_loop(self, pool):
+        display_frame = None
+        aruco_data = None
+        detected_objects = []
+        frame_id = None
+
+        try:
+            while not self.stop_event.is_set():
+                state = self.get_system_state()
+                self.governor.throttle(state)
+
+                frame = self.camera.capture()
+                if frame is None:
+                    self.logger.error("Failed to grab frame. Stopping cell.")
+                    break
+
+                # Only changed frames are detected, with a shared pool the cell waits for its own result
+                if self.motion_gate.should_process(frame):
+                    if pool:
+                        display_frame, aruco_data, detected_objects = pool.submit(self.name, self.detector, frame, state).result()
+                    else:
+                        display_frame, aruco_data, detected_objects = self.detector.process_frame(frame)
+                    if self.recorder:
+                        frame_id = self.recorder.record_frame(frame)
+                        self.recorder.record_detections(frame_id, aruco_data, detected_objects)
+
+                if self.stats_interval_frames > 0 and self.motion_gate.frames_total > 0 and \
+                        self.motion_gate.frames_total % self.stats_interval_frames == 0:
+                    self.motion_gate.log_stats()
+
+                if self.show_display and display_frame is not None:
+                    cv2.imshow(f"Real-Time Object Detection for Braccio Control - {self.name}", display_frame)
+
+                candidates = [
+                    (self.get_coords(obj), COLOR_CLASSES[obj['color_name']])
+                    for obj in detected_objects
+                    if obj['color_name'] in COLOR_CLASSES and obj['rel_3d_from_aruco_mm'] is not None
+                ]
+                self.pick_controller.update(candidates, frame_id)
+
+                if self.show_display:
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == ord('q'):
+                        break
+        except Exception as e:
+            self.logger.error("An error occurred in the camera loop: %s", e)
+        finally:
+            self.camera.stop()
+            if self.show_display:
+                cv2.destroyAllWindows()
+            self.motion_gate.log_stats()
+            self.governor.log_stats()
+            self.pick_controller.log_stats()
+            if self.recorder:
+                self.recorder.stop()
+            if self.bt_connected:
+                self.bt_sender.disconnect()
+            self.logger.info("Cell stopped.")
+
+    def ready_loop(self):
+        try:
+            while True:
+                data = self.bt_sender.receive_ready()
+                if not data:
+                    self.logger.warning("Arm connection closed.")
+                    return
+                self.logger.info("Received ready!")
+                # Sends the prepared pick straight from this thread, without waiting for the next frame
+                self.pick_controller.on_ready()
+                self.governor.wake()
+        except Exception as e:
+            self.logger.error("Error while waiting for the arm: %s", e)
+
+    def android_loop(self):
+        if not self.android_server.start_server():
+            return
+        self.client_sock, _ = self.android_server.accept_connection()
+        if not self.client_sock:
+            self.logger.warning("Bluetooth connection to android app failed. Colour data will not be sent.")
+            return
+        self.logger.info("Connection established and ready for communication.")
+        while True:
+            received_data = self.android_server.receive_data(self.client_sock)
+            if received_data:
+                try:
+                    self.set_system_start(int(received_data))
+                    self.logger.info("System start flag updated to: %s", self.system_start)
+                except ValueError:
+                    self.logger.warning("Received non-integer data for system_start: '%s'", received_data)
+            elif not self.android_server.client_sock:
+                return # connection closed
+            time.sleep(0.1)